@@ -0,0 +1,76 @@
+# Micro-benchmark of the calendar construction from base effects : the former
+# dense update (one O(horizon) slice per effect) against the one-pass
+# construction of the converter, ConvertToDiscreteOptim._update_calendars.
+
+import logging
+import random
+import timeit
+
+import numpy as np
+from unified_planning.model import EffectKind
+from unified_planning.model.scheduling import SchedulingProblem
+
+from up_discreteoptimization.convert_problem import ConvertToDiscreteOptim
+
+logger = logging.getLogger(__name__)
+
+
+def build_problem_with_events(
+    nb_resources: int = 20, nb_events: int = 5000, horizon: int = 100000
+) -> SchedulingProblem:
+    random.seed(0)
+    problem = SchedulingProblem("calendar-benchmark")
+    resources = [
+        problem.add_resource(f"r{i}", capacity=10) for i in range(nb_resources)
+    ]
+    for _ in range(nb_events // 2):
+        resource = random.choice(resources)
+        start = random.randint(0, horizon - 100)
+        problem.add_decrease_effect(start, resource, 1)
+        problem.add_increase_effect(start + random.randint(1, 100), resource, 1)
+    return problem
+
+
+def dense_calendars(problem: SchedulingProblem, horizon: int = 100000):
+    calendars = {
+        r.name: r.type.upper_bound * np.ones(horizon)
+        for r in problem.fluents
+        if r.type.is_int_type()
+    }
+    for time, effect in problem.base_effects:
+        name_fluent = effect.fluent.fluent().name
+        if effect.kind == EffectKind.DECREASE:
+            calendars[name_fluent][time.delay :] -= effect.value.constant_value()
+        if effect.kind == EffectKind.INCREASE:
+            calendars[name_fluent][time.delay :] += effect.value.constant_value()
+    return calendars
+
+
+def sparse_calendars(converter: ConvertToDiscreteOptim):
+    # Calendars are only rebuilt when their events changed, they are reset so
+    # that each run builds them all.
+    converter.capacity_resource = {}
+    converter.calendar_events = {}
+    converter.calendars = {}
+    converter._update_calendars()
+    return converter.calendars
+
+
+def run_benchmark():
+    for nb_events in [100, 1000, 10000]:
+        problem = build_problem_with_events(nb_events=nb_events)
+        converter = ConvertToDiscreteOptim(problem)
+        dense = dense_calendars(problem)
+        sparse = sparse_calendars(converter)
+        assert all(np.array_equal(dense[r], sparse[r].to_array(100000)) for r in dense)
+        time_dense = min(timeit.repeat(lambda: dense_calendars(problem), number=1))
+        time_sparse = min(timeit.repeat(lambda: sparse_calendars(converter), number=1))
+        logger.info(
+            f"{nb_events} events : dense {time_dense:.4f}s, "
+            f"sparse {time_sparse:.4f}s, speedup x{time_dense / time_sparse:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_benchmark()
@@ -0,0 +1,322 @@
+# Benchmark of the conversion, back-conversion and solving on the example
+# instances (FT06, ta59, j301_1) and on synthetic RCPSP instances of growing size.
+# Wall time, peak memory (as traced by tracemalloc) and makespan are written
+# as json or csv, so that results of different revisions can be compared.
+# Job shops (FT06) are also solved with the CP-SAT job shop model and with the
+# generic RCPSP route, and the time each takes to reach the optimum is reported.
+#
+# python examples/benchmark_suite.py --sizes 1000 10000 --output bench.json
+
+import os
+
+os.environ["DO_SKIP_MZN_CHECK"] = "1"
+import argparse
+import csv
+import json
+import logging
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from discrete_optimization.rcpsp.rcpsp_solvers import solvers_map
+from unified_planning.engines import PlanGenerationResultStatus
+from unified_planning.model.metrics import MinimizeMakespan
+from unified_planning.model.scheduling import SchedulingProblem
+from unified_planning.shortcuts import LE
+
+from examples.example_jobshop import FT06, parse
+from examples.parse_jobshop import parse_jsplib
+from examples.parse_rcpsp import parse_rcpsp_to_up
+from up_discreteoptimization.bounds import makespan_lower_bound
+from up_discreteoptimization.convert_problem import ConvertToDiscreteOptim
+from up_discreteoptimization.engine_do import EngineDiscreteOptimization
+
+logger = logging.getLogger(__name__)
+
+
+def build_synthetic_problem(
+    nb_activities: int,
+    nb_resources: int = 4,
+    capacity: int = 10,
+    nb_predecessors: int = 2,
+    seed: int = 0,
+) -> SchedulingProblem:
+    """Random RCPSP instance, activities are spread over layers of 100 and
+    depend on activities of the previous layer."""
+    rng = random.Random(seed)
+    problem = SchedulingProblem(f"synthetic-{nb_activities}")
+    resources = [
+        problem.add_resource(f"r{i}", capacity=capacity) for i in range(nb_resources)
+    ]
+    layer_size = 100
+    activities = []
+    for i in range(nb_activities):
+        activity = problem.add_activity(f"a{i}", duration=rng.randint(1, 10))
+        for resource in rng.sample(resources, rng.randint(1, 2)):
+            activity.uses(resource, amount=rng.randint(1, capacity // 2))
+        layer = i // layer_size
+        if layer > 0:
+            previous_layer = activities[(layer - 1) * layer_size : layer * layer_size]
+            for predecessor in rng.sample(previous_layer, nb_predecessors):
+                problem.add_constraint(LE(predecessor.end, activity.start))
+        activities.append(activity)
+    problem.add_quality_metric(MinimizeMakespan())
+    return problem
+
+
+def measure(function: Callable[[], Any]) -> Tuple[Any, float, float]:
+    """Returns the result of function, its wall time (s) and peak memory (MB)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = function()
+        wall_time = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, wall_time, peak / 2**20
+
+
+def environment() -> Dict[str, Any]:
+    versions = {}
+    for package in ["unified-planning", "discrete-optimization"]:
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": revision,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        **versions,
+    }
+
+
+def benchmark_instance(
+    name: str,
+    problem: SchedulingProblem,
+    solver_name: Optional[str] = None,
+    timeout: Optional[float] = None,
+    detect_job_shop: bool = False,
+) -> Dict[str, Any]:
+    record: Dict[str, Any] = {
+        "instance": name,
+        "nb_activities": len(problem.activities),
+    }
+    converter = ConvertToDiscreteOptim(problem)
+    do_problem, record["convert_time"], record["convert_memory"] = measure(
+        converter.build_scheduling_problem_do
+    )
+    # Out of the measures, the first schedule generation includes the jit compilation.
+    solution = do_problem.get_dummy_solution()
+    _, record["back_convert_time"], record["back_convert_memory"] = measure(
+        lambda: converter.build_up_plan(solution)
+    )
+    record["lower_bound"] = makespan_lower_bound(do_problem)
+    solver_class = {s.__name__: s for s in solvers_map}.get(solver_name)
+    with EngineDiscreteOptimization(
+        solver_class=solver_class, detect_job_shop=detect_job_shop
+    ) as planner:
+        planner.skip_checks = True
+        result, record["solve_time"], record["solve_memory"] = measure(
+            lambda: planner.solve(problem, timeout=timeout)
+        )
+        record["solver"] = solver_name
+        record["detect_job_shop"] = detect_job_shop
+        record["status"] = result.status.name
+        record["makespan"] = (
+            None
+            if planner.do_solution is None
+            else planner.do_problem.evaluate(planner.do_solution)["makespan"]
+        )
+    if record["makespan"] is not None and record["makespan"] > 0:
+        record["gap"] = (record["makespan"] - record["lower_bound"]) / record[
+            "makespan"
+        ]
+    else:
+        record["gap"] = None
+    logger.info(
+        f"{name} : convert {record['convert_time']:.2f}s, "
+        f"solve {record['solve_time']:.2f}s, makespan {record['makespan']}"
+    )
+    return record
+
+
+def time_to_optimum(
+    problem: SchedulingProblem,
+    optimum: Optional[int],
+    timeout: Optional[float] = None,
+    **engine_kwargs,
+) -> Tuple[Optional[float], Optional[int]]:
+    """Time from the start of the solve to the first schedule of makespan
+    optimum (None if not reached before the timeout), and the best makespan."""
+    best_makespan = None
+    with EngineDiscreteOptimization(**engine_kwargs) as planner:
+        planner.skip_checks = True
+        for result in planner.get_solutions(problem, timeout=timeout):
+            if result.plan is None or "objective" not in result.metrics:
+                continue
+            makespan = int(result.metrics["objective"])
+            if best_makespan is None or makespan < best_makespan:
+                best_makespan = makespan
+            if optimum is not None and makespan <= optimum:
+                return float(result.metrics["elapsed_time"]), best_makespan
+    return None, best_makespan
+
+
+def benchmark_job_shop_routes(
+    name: str,
+    problem: SchedulingProblem,
+    solver_name: str,
+    timeout: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Time to optimum of the job shop with the CP-SAT model and with the
+    generic RCPSP route solved by solver_name, the optimum being the makespan
+    CP-SAT proves optimal (None if it does not within the timeout)."""
+    with EngineDiscreteOptimization(detect_job_shop=True) as planner:
+        planner.skip_checks = True
+        result = planner.solve(problem, timeout=timeout)
+        optimum = (
+            int(result.metrics["objective"])
+            if result.status == PlanGenerationResultStatus.SOLVED_OPTIMALLY
+            else None
+        )
+    record: Dict[str, Any] = {
+        "instance": name,
+        "nb_activities": len(problem.activities),
+        "optimum": optimum,
+        "solver": solver_name,
+    }
+    (
+        record["cp_sat_time_to_optimum"],
+        record["cp_sat_makespan"],
+    ) = time_to_optimum(problem, optimum, timeout, detect_job_shop=True)
+    # Out of the measures, the first schedule generation includes the jit compilation.
+    ConvertToDiscreteOptim(problem).build_scheduling_problem_do().get_dummy_solution()
+    (record["rcpsp_time_to_optimum"], record["rcpsp_makespan"],) = time_to_optimum(
+        problem,
+        optimum,
+        timeout,
+        solver_class={s.__name__: s for s in solvers_map}[solver_name],
+    )
+    times = {
+        route: "not reached" if t is None else f"{t:.2f}s"
+        for route, t in [
+            ("CP-SAT", record["cp_sat_time_to_optimum"]),
+            (solver_name, record["rcpsp_time_to_optimum"]),
+        ]
+    }
+    logger.info(f"{name} : time to the optimum {optimum} {times}")
+    return record
+
+
+def job_shop_instances() -> List[Tuple[str, Callable[[], SchedulingProblem]]]:
+    # Without the operators of the example, FT06 is a pure job shop.
+    return [("ft06-jobshop", lambda: parse(FT06, "ft06", add_operators=False))]
+
+
+def instances(sizes: List[int]) -> List[Tuple[str, Callable[[], SchedulingProblem]]]:
+    instance_builders = [
+        ("ft06", lambda: parse(FT06, "ft06")),
+        ("ta59", parse_jsplib),
+        ("j301_1", parse_rcpsp_to_up),
+    ]
+    for size in sizes:
+        instance_builders.append(
+            (f"synthetic-{size}", lambda size=size: build_synthetic_problem(size))
+        )
+    return instance_builders
+
+
+def write_results(records: List[Dict[str, Any]], output: str):
+    if output.endswith(".csv"):
+        env = environment()
+        with open(output, "w", newline="") as file:
+            # Records of the job shop routes have their own columns.
+            fieldnames = list(env) + list(
+                dict.fromkeys(key for record in records for key in record)
+            )
+            writer = csv.DictWriter(file, fieldnames=fieldnames)
+            writer.writeheader()
+            for record in records:
+                writer.writerow({**env, **record})
+    else:
+        with open(output, "w") as file:
+            json.dump(
+                {"environment": environment(), "results": records}, file, indent=2
+            )
+
+
+def run_benchmark():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="*", default=[100, 1000, 10000])
+    parser.add_argument(
+        "--solver",
+        default=None,
+        help="Name of the DO solver class, e.g. LS_RCPSP_Solver. "
+        "By default the serial SGS schedule of the default permutation is used.",
+    )
+    parser.add_argument("--timeout", type=float, default=None)
+    parser.add_argument(
+        "--detect-job-shop",
+        action="store_true",
+        help="Solve pure job shops with the dedicated CP-SAT model.",
+    )
+    parser.add_argument(
+        "--job-shop-solver",
+        default="LS_RCPSP_Solver",
+        help="Name of the DO solver class of the generic route on job shops.",
+    )
+    parser.add_argument(
+        "--job-shop-timeout",
+        type=float,
+        default=60,
+        help="Time limit of each route on job shops.",
+    )
+    parser.add_argument("--output", default="benchmark.json")
+    args = parser.parse_args()
+    records = []
+    for name, build_problem in instances(args.sizes):
+        start = time.perf_counter()
+        problem = build_problem()
+        load_time = time.perf_counter() - start
+        record = benchmark_instance(
+            name,
+            problem,
+            solver_name=args.solver,
+            timeout=args.timeout,
+            detect_job_shop=args.detect_job_shop,
+        )
+        record["load_time"] = load_time
+        records.append(record)
+    for name, build_problem in job_shop_instances():
+        records.append(
+            benchmark_job_shop_routes(
+                name,
+                build_problem(),
+                solver_name=args.job_shop_solver,
+                timeout=args.job_shop_timeout,
+            )
+        )
+    write_results(records, args.output)
+    logger.info(f"Results written in {args.output}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_benchmark()
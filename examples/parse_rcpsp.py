@@ -2,11 +2,13 @@ import logging
 import os
 from typing import Dict, List, Optional
 
-from discrete_optimization.rcpsp.rcpsp_parser import RCPSPModel, parse_file
+from discrete_optimization.rcpsp.rcpsp_model import RCPSPModel
 from discrete_optimization.rcpsp.rcpsp_utils import create_fake_tasks
 from unified_planning.model.scheduling import SchedulingProblem
 from unified_planning.shortcuts import LE, Equals
 
+from up_discreteoptimization.loaders import load_psplib, rcpsp_to_up
+
 logger = logging.getLogger(__name__)
 this_folder = os.path.dirname(os.path.abspath(__file__))
 default_file = os.path.join(this_folder, "j301_1.sm")
@@ -15,8 +17,9 @@ default_file = os.path.join(this_folder, "j301_1.sm")
 def parse_rcpsp_to_up(filename: Optional[str] = None):
     if filename is None:
         filename = default_file
-    rcpsp_problem: RCPSPModel = parse_file(file_path=filename)
-    return from_do_to_up(rcpsp_problem)
+    problem = rcpsp_to_up(load_psplib(filename), name="rcpsp")
+    logger.info(f"Scheduling problem instanciated, {problem}")
+    return problem
 
 
 def from_do_to_up(rcpsp_problem: RCPSPModel) -> SchedulingProblem:
@@ -0,0 +1,47 @@
+import os
+
+os.environ["DO_SKIP_MZN_CHECK"] = "1"
+import asyncio
+import logging
+
+from discrete_optimization.rcpsp.rcpsp_solvers import LS_RCPSP_Solver
+from example_jobshop import FT06, parse
+
+from examples.parse_jobshop import parse_jsplib
+from up_discreteoptimization.engine_do import EngineDiscreteOptimization
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+async def solve_one(problem, timeout: float):
+    # One engine per request, each solve runs in its own process.
+    engine = EngineDiscreteOptimization(solver_class=LS_RCPSP_Solver)
+    engine.skip_checks = True
+    result = await engine.solve_async(problem, timeout=timeout)
+    print(problem.name, result.status, (result.metrics or {}).get("objective"))
+
+
+async def follow_incumbents(problem, timeout: float):
+    engine = EngineDiscreteOptimization(solver_class=LS_RCPSP_Solver)
+    engine.skip_checks = True
+    async for result in engine.get_solutions_async(problem, timeout=timeout):
+        print(problem.name, "incumbent", result.metrics["objective"])
+
+
+async def run_async():
+    ft06 = parse(FT06, "ft06", add_operators=False)
+    ta59 = parse_jsplib()
+    # Solving ta59 is cancelled after 20s, its solver processes are killed.
+    long_solve = asyncio.create_task(solve_one(ta59, timeout=300))
+    await asyncio.gather(solve_one(ft06, timeout=30), follow_incumbents(ft06, 30))
+    await asyncio.sleep(20)
+    long_solve.cancel()
+    try:
+        await long_solve
+    except asyncio.CancelledError:
+        print("ta59 cancelled")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_async())
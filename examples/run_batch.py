@@ -0,0 +1,40 @@
+import os
+
+os.environ["DO_SKIP_MZN_CHECK"] = "1"
+import logging
+
+from discrete_optimization.rcpsp.rcpsp_solvers import LS_RCPSP_Solver
+from example_jobshop import FT06, parse
+
+from examples.parse_jobshop import default_file, parse_jsplib
+from up_discreteoptimization.batch import solve_batch
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def run_batch():
+    # Problems and instance files can be mixed, files are read in the workers.
+    instances = [
+        parse(FT06, "ft06", add_operators=add_operators)
+        for add_operators in [True, False]
+    ]
+    instances.append(default_file)
+    for result in solve_batch(
+        instances,
+        loader=parse_jsplib,
+        max_workers=2,
+        timeout=30,
+        solver_class=LS_RCPSP_Solver,
+    ):
+        print(
+            result.name,
+            result.status,
+            result.makespan,
+            f"load {result.load_time:.2f}s",
+            f"solve {result.solve_time:.2f}s",
+        )
+
+
+if __name__ == "__main__":
+    run_batch()
@@ -0,0 +1,48 @@
+import os
+
+os.environ["DO_SKIP_MZN_CHECK"] = "1"
+import logging
+
+from discrete_optimization.generic_tools.ea.ga_tools import ParametersGa
+from discrete_optimization.rcpsp.rcpsp_solvers import GA_RCPSP_Solver, LS_RCPSP_Solver
+from example_jobshop import FT06, parse
+
+from up_discreteoptimization.engine_do import EngineDiscreteOptimization
+from up_discreteoptimization.instrumentation import export_rows
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def run_convergence(output_directory: str = "convergence"):
+    # Objective over time of a few solver configurations, one CSV row per
+    # improving schedule, and the CPU profile of each solve.
+    os.makedirs(output_directory, exist_ok=True)
+    params_ga = ParametersGa.default_rcpsp()
+    params_ga.max_evals = 5000
+    configurations = {
+        "ls_1000": (LS_RCPSP_Solver, {"nb_iteration_max": 1000}),
+        "ls_5000": (LS_RCPSP_Solver, {"nb_iteration_max": 5000}),
+        "ga": (GA_RCPSP_Solver, {"parameters_ga": params_ga}),
+    }
+    trace = []
+    for name, (solver_class, params) in configurations.items():
+        engine = EngineDiscreteOptimization(
+            solver_class=solver_class,
+            trace_convergence=True,
+            profile_cpu=True,
+            **params,
+        )
+        engine.skip_checks = True
+        result = engine.solve(parse(FT06, "ft06", add_operators=False), timeout=60)
+        print(name, result.status, result.metrics.get("objective"))
+        trace.extend(
+            {"configuration": name, **entry}
+            for entry in engine.convergence_trace.entries
+        )
+        engine.profiler.export_cpu(os.path.join(output_directory, f"{name}_cpu.json"))
+    export_rows(trace, os.path.join(output_directory, "convergence.csv"))
+
+
+if __name__ == "__main__":
+    run_convergence()
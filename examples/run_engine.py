@@ -3,7 +3,6 @@ import os
 os.environ["DO_SKIP_MZN_CHECK"] = "1"
 import logging
 
-import unified_planning.engines
 from discrete_optimization.generic_rcpsp_tools.gphh_solver import GPHH, ParametersGPHH
 from discrete_optimization.generic_tools.ea.ga_tools import ParametersGa
 from discrete_optimization.rcpsp.rcpsp_solvers import (  # You can pass many solvers to the engine
@@ -46,18 +45,16 @@ def run_solver():
     params_ga.max_evals = 1000000
     params_cp = ParametersCP.default()
     params_cp.free_search = True
-    params_cp.time_limit = 20
     with EngineDiscreteOptimization(
         solver_class=CP_RCPSP_MZN,
         parameters_cp=params_cp,
         cp_solver_name=CPSolverName.CHUFFED,  # cp_solver_name=CPSolverName.ORTOOLS, output_type=True
     ) as planner:
         planner.skip_checks = True
-        result = planner.solve(model)
-        if (
-            result.status
-            == unified_planning.engines.PlanGenerationResultStatus.SOLVED_SATISFICING
-        ):
+        # The timeout is split between conversion and solving, the solving share
+        # is mapped onto the solver time limit (here params_cp.time_limit)
+        result = planner.solve(model, timeout=20)
+        if result.plan is not None:
             print("DO returned: %s" % result.plan)
         else:
             print("No plan found.")
@@ -0,0 +1,42 @@
+import os
+
+os.environ["DO_SKIP_MZN_CHECK"] = "1"
+import logging
+
+from discrete_optimization.rcpsp.rcpsp_solvers import LS_RCPSP_Solver
+from unified_planning.model import GlobalStartTiming
+
+from examples.parse_jobshop import parse_jsplib
+from up_discreteoptimization.engine_do import EngineDiscreteOptimization
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def run_repair():
+    problem = parse_jsplib()
+    planner = EngineDiscreteOptimization(
+        solver_class=LS_RCPSP_Solver, nb_iteration_max=1000
+    )
+    planner.skip_checks = True
+    result = planner.solve(problem, timeout=60)
+    print("Initial schedule", result.metrics["objective"])
+    # At time 500, machine_3 is known to be down from 600 to 650. Activities
+    # started before 500 are kept, only those starting before 700 are
+    # rescheduled (or more if no schedule is found so).
+    machine = problem.fluent("machine_3")
+    problem.add_decrease_effect(GlobalStartTiming(600), machine, 1)
+    problem.add_increase_effect(GlobalStartTiming(650), machine, 1)
+    repaired = planner.repair(
+        problem, result.plan, disruption_time=500, window=200, timeout=120
+    )
+    print(
+        "Repaired schedule",
+        repaired.status,
+        repaired.metrics.get("objective"),
+        f"{len(planner.do_problem.tasks_list_non_dummy)} activities rescheduled",
+    )
+
+
+if __name__ == "__main__":
+    run_repair()
@@ -0,0 +1,46 @@
+import os
+
+os.environ["DO_SKIP_MZN_CHECK"] = "1"
+
+import numpy as np
+from unified_planning.engines import PlanGenerationResultStatus
+
+from up_discreteoptimization.batch import solve_batch
+from up_discreteoptimization.loaders import JobShopInstance, job_shop_to_up, load_jsplib
+
+
+def load_job_shop(path: str):
+    return job_shop_to_up(load_jsplib(path))
+
+
+def test_solve_batch(tmp_path):
+    instance = JobShopInstance(
+        machines=np.array([[0, 1], [1, 0]]),
+        durations=np.array([[2, 3], [4, 1]]),
+        name="js2",
+    )
+    path = tmp_path / "js2"
+    path.write_text("2 2\n0 2 1 3\n1 4 0 1\n")
+    instances = [job_shop_to_up(instance), str(path), str(tmp_path / "missing")]
+    results = sorted(
+        solve_batch(
+            instances,
+            loader=load_job_shop,
+            max_workers=2,
+        ),
+        key=lambda result: result.index,
+    )
+    assert [result.index for result in results] == [0, 1, 2]
+    for result in results[:2]:
+        assert result.status in [
+            PlanGenerationResultStatus.SOLVED_SATISFICING,
+            PlanGenerationResultStatus.SOLVED_OPTIMALLY,
+        ]
+        assert result.error is None
+        assert len(result.schedule) == 4
+        assert result.makespan == max(end for _, end in result.schedule.values())
+        # The second job waits for machine 1 or the first job for machine 0.
+        assert result.makespan >= 5
+    assert results[0].schedule == results[1].schedule
+    assert results[2].status == PlanGenerationResultStatus.INTERNAL_ERROR
+    assert results[2].error is not None
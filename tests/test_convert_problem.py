@@ -0,0 +1,163 @@
+import logging
+import os
+
+os.environ["DO_SKIP_MZN_CHECK"] = "1"
+
+from discrete_optimization.rcpsp.rcpsp_model import RCPSPModel
+from discrete_optimization.rcpsp.rcpsp_solvers import LS_RCPSP_Solver
+from unified_planning.engines import PlanGenerationResultStatus
+from unified_planning.model.scheduling import SchedulingProblem
+from unified_planning.shortcuts import LE, Equals
+
+from up_discreteoptimization.convert_problem import ConvertToDiscreteOptim
+from up_discreteoptimization.engine_do import EngineDiscreteOptimization
+
+
+def build_problem(nb_activities: int = 5) -> SchedulingProblem:
+    problem = SchedulingProblem("edits")
+    machine = problem.add_resource("m", capacity=1)
+    problem.add_resource("r", capacity=2)
+    activities = [
+        problem.add_activity(f"a{i}", duration=10) for i in range(nb_activities)
+    ]
+    for activity in activities[:3]:
+        activity.uses(machine, 1)
+    problem.add_constraint(LE(activities[0].end, activities[1].start))
+    problem.add_constraint(LE(activities[3].end, activities[4].start))
+    return problem
+
+
+def model_description(converter: ConvertToDiscreteOptim, model: RCPSPModel) -> dict:
+    special = model.special_constraints
+    return {
+        "mode_details": model.mode_details,
+        "successors": {t: sorted(s) for t, s in model.successors.items()},
+        "horizon": model.horizon,
+        "tasks": model.tasks_list,
+        "windows": None if special is None else special.start_times_window,
+        "durations": converter.plan_durations.tolist(),
+    }
+
+
+def updated_and_rebuilt(converter: ConvertToDiscreteOptim, **kwargs):
+    # Descriptions of the updated model and of the model converted from scratch.
+    updated = converter.update_scheduling_problem_do(**kwargs)
+    rebuilt = ConvertToDiscreteOptim(converter.problem)
+    return (
+        model_description(converter, updated),
+        model_description(rebuilt, rebuilt.build_scheduling_problem_do()),
+    )
+
+
+def test_update_activities_edited_in_place():
+    problem = build_problem()
+    converter = ConvertToDiscreteOptim(problem)
+    converter.build_scheduling_problem_do()
+    activities = problem.activities
+    activities[0].set_fixed_duration(100)
+    activities[3].uses(problem.fluent("m"), 1)
+    activities[2].add_release_date(25)
+    updated, rebuilt = updated_and_rebuilt(converter)
+    assert updated == rebuilt
+    assert updated["mode_details"]["a0"][1]["duration"] == 100
+    assert updated["mode_details"]["a3"][1]["m"] == 1
+    assert updated["windows"]["a2"] == (25, None)
+
+
+def test_update_with_edited_activities_given():
+    problem = build_problem()
+    converter = ConvertToDiscreteOptim(problem)
+    converter.build_scheduling_problem_do()
+    activities = problem.activities
+    activities[4].set_fixed_duration(7)
+    new_activity = problem.add_activity("a5", duration=3)
+    new_activity.uses(problem.fluent("r"), 2)
+    problem.add_constraint(LE(activities[4].end, new_activity.start))
+    updated, rebuilt = updated_and_rebuilt(converter, edited_activities=[activities[4]])
+    assert updated == rebuilt
+    assert "a5" in updated["successors"]["a4"]
+
+
+def test_update_constraint_reading_an_edited_duration():
+    # The deadline on the end is kept as a bound on the start, which depends on
+    # the duration of the activity.
+    problem = build_problem()
+    activities = problem.activities
+    activities[1].add_deadline(60)
+    converter = ConvertToDiscreteOptim(problem)
+    converter.build_scheduling_problem_do()
+    activities[1].set_fixed_duration(30)
+    updated, rebuilt = updated_and_rebuilt(converter)
+    assert updated == rebuilt
+    assert converter.deadlines["a1"] == 60
+
+
+def test_engine_solves_edited_problem():
+    problem = build_problem()
+    engine = EngineDiscreteOptimization()
+    engine.skip_checks = True
+    engine.solve(problem)
+    activities = problem.activities
+    activities[0].set_fixed_duration(100)
+    activities[3].uses(problem.fluent("m"), 1)
+    result = engine.solve(problem)
+    fresh = EngineDiscreteOptimization()
+    fresh.skip_checks = True
+    expected = fresh.solve(problem)
+    assert result.metrics["objective"] == expected.metrics["objective"]
+    assert int(result.metrics["objective"]) >= 100 + 10 + 10
+
+
+def build_special_problem() -> SchedulingProblem:
+    problem = SchedulingProblem("special")
+    machine = problem.add_resource("m", capacity=1)
+    activities = [
+        problem.add_activity(f"a{i}", duration=duration)
+        for i, duration in enumerate([4, 3, 5, 2, 6, 3])
+    ]
+    for activity in activities[:3] + [activities[4]]:
+        activity.uses(machine, 1)
+    problem.add_constraint(Equals(activities[1].start, activities[3].start))
+    problem.add_constraint(Equals(activities[0].end, activities[5].start))
+    problem.add_constraint(LE(activities[0].end + 7, activities[4].start))
+    problem.add_constraint(LE(activities[1].start + 9, activities[2].start))
+    return problem
+
+
+def test_special_constraints_emitted():
+    model = ConvertToDiscreteOptim(
+        build_special_problem()
+    ).build_scheduling_problem_do()
+    special = model.special_constraints
+    assert special.start_together == [("a1", "a3")]
+    assert special.start_at_end == [("a0", "a5")]
+    assert special.start_at_end_plus_offset == [("a0", "a4", 7)]
+    assert special.start_after_nunit == [("a1", "a2", 9)]
+    solution = model.get_dummy_solution()
+    assert model.satisfy(solution)
+    assert model.evaluate(solution)["constraint_penalty"] == 0
+    starts = {t: solution.get_start_time(t) for t in model.tasks_list}
+    assert starts["a1"] == starts["a3"]
+    assert starts["a5"] >= solution.get_end_time("a0")
+    assert starts["a4"] >= solution.get_end_time("a0") + 7
+    assert starts["a2"] >= starts["a1"] + 9
+
+
+def test_special_constraints_solved_by_local_search():
+    for params in [{}, {"scale_time": True, "reduce_precedences": True}]:
+        engine = EngineDiscreteOptimization(
+            solver_class=LS_RCPSP_Solver, nb_iteration_max=100, **params
+        )
+        engine.skip_checks = True
+        result = engine.solve(build_special_problem())
+        assert result.status == PlanGenerationResultStatus.SOLVED_SATISFICING
+
+
+def test_unsupported_constraint_logged(caplog):
+    problem = build_problem()
+    activities = problem.activities
+    # A negative offset : a1 may start before a0.
+    problem.add_constraint(LE(activities[0].start, activities[1].start + 5))
+    with caplog.at_level(logging.WARNING):
+        ConvertToDiscreteOptim(problem).build_scheduling_problem_do()
+    assert "ignored" in caplog.text
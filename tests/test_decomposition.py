@@ -0,0 +1,80 @@
+import os
+
+os.environ["DO_SKIP_MZN_CHECK"] = "1"
+
+from discrete_optimization.rcpsp.rcpsp_solvers import LS_RCPSP_Solver
+from unified_planning.model.scheduling import SchedulingProblem
+from unified_planning.shortcuts import LE
+
+from up_discreteoptimization.convert_problem import ConvertToDiscreteOptim
+from up_discreteoptimization.decomposition import (
+    build_component_problem,
+    connected_components,
+    merge_component_solutions,
+    solve_decomposed,
+)
+from up_discreteoptimization.engine_do import EngineDiscreteOptimization
+
+
+def build_shops() -> SchedulingProblem:
+    # Two shops of one machine each, and an activity using no resource.
+    problem = SchedulingProblem("shops")
+    for shop in ["a", "b"]:
+        machine = problem.add_resource(f"m{shop}", capacity=1)
+        activities = [
+            problem.add_activity(f"{shop}{i}", duration=2 + i) for i in range(3)
+        ]
+        for activity in activities:
+            activity.uses(machine, 1)
+        problem.add_constraint(LE(activities[2].end, activities[0].start))
+    problem.add_activity("c", duration=4)
+    return problem
+
+
+def test_connected_components():
+    converter = ConvertToDiscreteOptim(build_shops())
+    converter.build_scheduling_problem_do()
+    assert connected_components(converter) == [
+        ["a0", "a1", "a2"],
+        ["b0", "b1", "b2"],
+        ["c"],
+    ]
+
+
+def test_merge_component_solutions():
+    converter = ConvertToDiscreteOptim(build_shops())
+    problem = converter.build_scheduling_problem_do()
+    solutions = [
+        build_component_problem(converter, tasks).get_dummy_solution()
+        for tasks in connected_components(converter)
+    ]
+    merged = merge_component_solutions(problem, solutions)
+    assert problem.satisfy(merged)
+    for solution in solutions:
+        for task in solution.problem.tasks_list_non_dummy:
+            assert merged.get_start_time(task) == solution.get_start_time(task)
+    assert problem.evaluate(merged)["makespan"] == max(
+        solution.get_max_end_time() for solution in solutions
+    )
+
+
+def test_solve_decomposed():
+    converter = ConvertToDiscreteOptim(build_shops())
+    problem = converter.build_scheduling_problem_do()
+    result = solve_decomposed(
+        converter,
+        problem,
+        LS_RCPSP_Solver,
+        {"nb_iteration_max": 100},
+        time_limit=60,
+        max_workers=2,
+    )
+    solution = result.get_best_solution()
+    assert problem.satisfy(solution)
+    # Each shop runs its three activities in a row.
+    assert problem.evaluate(solution)["makespan"] == 9
+    engine = EngineDiscreteOptimization(
+        solver_class=LS_RCPSP_Solver, nb_iteration_max=100, decompose=True
+    )
+    engine.skip_checks = True
+    assert engine.solve(build_shops()).metrics["objective"] == "9"
@@ -0,0 +1,44 @@
+import os
+
+os.environ["DO_SKIP_MZN_CHECK"] = "1"
+
+import threading
+
+import pytest
+
+from up_discreteoptimization.instrumentation import SolveStopped, trace_evaluations
+from up_discreteoptimization.loaders import load_psplib, rcpsp_to_do
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), "..", "examples")
+
+
+def load_problem():
+    return rcpsp_to_do(load_psplib(os.path.join(EXAMPLES, "j301_1.sm")))
+
+
+def test_trace_evaluations_of_solver_threads():
+    problem = load_problem()
+    solution = problem.get_dummy_solution()
+    makespans = []
+    traced = trace_evaluations(
+        problem, lambda _, makespan: makespans.append(makespan) or False
+    )
+    worker = threading.Thread(target=traced.evaluate, args=(solution,))
+    worker.start()
+    worker.join()
+    traced.evaluate(solution)
+    expected = problem.evaluate(solution)["makespan"]
+    assert makespans == [expected, expected]
+    # The problem itself, which may be shared, is not traced.
+    assert "evaluate" not in problem.__dict__
+
+
+def test_trace_evaluations_stop():
+    problem = load_problem()
+    solution = problem.get_dummy_solution()
+    traced = trace_evaluations(problem, lambda *_: True)
+    other = trace_evaluations(problem, lambda *_: False)
+    for _ in range(2):
+        with pytest.raises(SolveStopped):
+            traced.evaluate(solution)
+    assert other.evaluate(solution) == problem.evaluate(solution)
@@ -0,0 +1,44 @@
+import os
+
+os.environ["DO_SKIP_MZN_CHECK"] = "1"
+
+from unified_planning.model.scheduling import SchedulingProblem
+from unified_planning.shortcuts import LE
+
+from up_discreteoptimization.convert_problem import ConvertToDiscreteOptim
+from up_discreteoptimization.jobshop import detect_job_shop
+
+
+def build_job_shop(capacity: int = 1, shared_task: bool = False) -> SchedulingProblem:
+    # Two jobs of two operations on two machines.
+    problem = SchedulingProblem("job_shop")
+    machines = [problem.add_resource(f"m{i}", capacity=capacity) for i in range(2)]
+    for job in range(2):
+        previous = None
+        for operation in range(2):
+            activity = problem.add_activity(f"j{job}_{operation}", duration=3)
+            activity.uses(machines[(job + operation) % 2], 1)
+            if previous is not None:
+                problem.add_constraint(LE(previous.end, activity.start))
+            previous = activity
+    if shared_task:
+        problem.activities[0].uses(machines[1], 1)
+    return problem
+
+
+def job_shop_of(problem: SchedulingProblem):
+    converter = ConvertToDiscreteOptim(problem)
+    model = converter.build_scheduling_problem_do()
+    return detect_job_shop(converter, model.horizon)
+
+
+def test_detect_job_shop():
+    job_shop = job_shop_of(build_job_shop())
+    assert job_shop is not None
+    assert sorted(job_shop.jobs) == [["j0_0", "j0_1"], ["j1_0", "j1_1"]]
+    assert job_shop.machine["j1_0"] == "m1"
+
+
+def test_detect_job_shop_rejects_other_problems():
+    assert job_shop_of(build_job_shop(capacity=2)) is None
+    assert job_shop_of(build_job_shop(shared_task=True)) is None
@@ -0,0 +1,66 @@
+import os
+
+os.environ["DO_SKIP_MZN_CHECK"] = "1"
+
+import pytest
+
+from up_discreteoptimization.convert_problem import ConvertToDiscreteOptim
+from up_discreteoptimization.loaders import (
+    job_shop_to_do,
+    job_shop_to_up,
+    load_jsplib,
+    load_psplib,
+    rcpsp_to_do,
+    rcpsp_to_up,
+)
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), "..", "examples")
+
+
+def test_rcpsp_to_do_matches_conversion():
+    instance = load_psplib(os.path.join(EXAMPLES, "j301_1.sm"))
+    direct = rcpsp_to_do(instance)
+    converted = ConvertToDiscreteOptim(
+        rcpsp_to_up(instance)
+    ).build_scheduling_problem_do()
+    assert direct.tasks_list == converted.tasks_list
+    assert direct.mode_details == converted.mode_details
+    assert direct.resources == converted.resources
+    assert direct.horizon == converted.horizon
+    assert {task: sorted(s) for task, s in direct.successors.items()} == {
+        task: sorted(s) for task, s in converted.successors.items()
+    }
+
+
+FT06 = """# Fisher and Thompson 6x6 instance
+6 6
+2 1 0 3 1 6 3 7 5 3 4 6
+1 8 2 5 4 10 5 10 0 10 3 4
+2 5 3 4 5 8 0 9 1 1 4 7
+1 5 0 5 2 5 3 3 4 8 5 9
+2 9 1 3 4 5 5 4 0 3 3 1
+1 3 3 3 5 9 0 10 4 4 2 1
+"""
+
+
+def test_load_jsplib_ft06(tmp_path):
+    path = tmp_path / "ft06"
+    path.write_text(FT06)
+    instance = load_jsplib(str(path))
+    assert instance.name == "ft06"
+    assert (instance.nb_jobs, instance.nb_machines) == (6, 6)
+    assert instance.machines[0].tolist() == [2, 0, 1, 3, 5, 4]
+    assert instance.durations[0].tolist() == [1, 3, 6, 7, 3, 6]
+    problem = job_shop_to_up(instance)
+    assert len(problem.activities) == 36
+    assert len(problem.fluents) == 6
+    model = job_shop_to_do(instance)
+    assert model.n_jobs_non_dummy == 36
+    assert len(model.resources_list) == 6
+
+
+def test_load_jsplib_machine_out_of_range(tmp_path):
+    path = tmp_path / "one_indexed"
+    path.write_text("2 2\n1 3 2 4\n2 1 1 5\n")
+    with pytest.raises(ValueError):
+        load_jsplib(str(path))
@@ -0,0 +1,25 @@
+import os
+
+os.environ["DO_SKIP_MZN_CHECK"] = "1"
+
+import multiprocessing
+import signal
+import time
+
+from up_discreteoptimization.portfolio import KILL_GRACE_PERIOD, kill_process
+
+
+def ignore_sigterm():
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    while True:
+        time.sleep(0.1)
+
+
+def test_kill_process_ignoring_sigterm():
+    process = multiprocessing.get_context().Process(target=ignore_sigterm, daemon=True)
+    process.start()
+    time.sleep(0.5)
+    start_time = time.perf_counter()
+    kill_process(process)
+    assert not process.is_alive()
+    assert time.perf_counter() - start_time < 3 * KILL_GRACE_PERIOD
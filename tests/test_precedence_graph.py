@@ -0,0 +1,57 @@
+import os
+
+os.environ["DO_SKIP_MZN_CHECK"] = "1"
+
+import pytest
+from unified_planning.model.scheduling import SchedulingProblem
+from unified_planning.shortcuts import LE
+
+from up_discreteoptimization.convert_problem import (
+    SINK_TASK,
+    SOURCE_TASK,
+    ConvertToDiscreteOptim,
+)
+from up_discreteoptimization.precedence_graph import transitive_reduction
+
+
+def test_transitive_reduction():
+    successors = {"a": ["b", "c", "b"], "b": ["c"], "c": [], "d": ["c"]}
+    reduced, nb_removed = transitive_reduction(successors)
+    assert reduced == {"a": ["b"], "b": ["c"], "c": [], "d": ["c"]}
+    assert nb_removed == 2
+
+
+def test_transitive_reduction_cycle():
+    with pytest.raises(ValueError, match="cycle"):
+        transitive_reduction({"a": ["b"], "b": ["c"], "c": ["a"], "d": []})
+
+
+def test_reduced_model():
+    # a0 -> a1 -> a2 with the redundant a0 -> a2, and a3 on its own.
+    problem = SchedulingProblem("chain")
+    machine = problem.add_resource("m", capacity=2)
+    activities = [problem.add_activity(f"a{i}", duration=i + 1) for i in range(4)]
+    for activity in activities:
+        activity.uses(machine, 1)
+    for i, j in [(0, 1), (1, 2), (0, 2)]:
+        problem.add_constraint(LE(activities[i].end, activities[j].start))
+    full = ConvertToDiscreteOptim(problem)
+    full_model = full.build_scheduling_problem_do()
+    reduced = ConvertToDiscreteOptim(problem, reduce_precedences=True)
+    model = reduced.build_scheduling_problem_do()
+    assert sorted(model.successors[SOURCE_TASK]) == ["a0", "a3"]
+    assert model.successors["a0"] == ["a1"]
+    assert model.successors["a2"] == [SINK_TASK]
+    assert model.successors["a3"] == [SINK_TASK]
+    # The redundant edge, source to a1 and a2, a0 and a1 to sink.
+    assert reduced.nb_removed_edges == 5
+    nb_edges = [
+        sum(len(successors) for successors in m.successors.values())
+        for m in [full_model, model]
+    ]
+    assert nb_edges[0] - nb_edges[1] == reduced.nb_removed_edges
+    # Same schedules, the precedences being equivalent.
+    assert (
+        model.get_dummy_solution().rcpsp_schedule
+        == full_model.get_dummy_solution().rcpsp_schedule
+    )
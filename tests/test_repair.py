@@ -0,0 +1,55 @@
+import os
+
+os.environ["DO_SKIP_MZN_CHECK"] = "1"
+
+import numpy as np
+from unified_planning.engines import PlanGenerationResultStatus
+from unified_planning.model import GlobalStartTiming
+
+from up_discreteoptimization.engine_do import EngineDiscreteOptimization
+from up_discreteoptimization.loaders import JobShopInstance, job_shop_to_up
+
+
+def test_repair_after_machine_breakdown():
+    instance = JobShopInstance(
+        machines=np.array([[0, 1, 2], [1, 2, 0], [2, 0, 1], [0, 2, 1]]),
+        durations=np.array([[3, 2, 2], [2, 1, 4], [4, 3, 1], [2, 2, 3]]),
+        name="js4",
+    )
+    problem = job_shop_to_up(instance)
+    engine = EngineDiscreteOptimization()
+    engine.skip_checks = True
+    result = engine.solve(problem)
+    before = engine.converter.plan_start_times(result.plan)
+    # machine_0 is down from 9 to 13, which is known at 8.
+    disruption_time, down = 8, (9, 13)
+    machine = problem.fluent("machine_0")
+    problem.add_decrease_effect(GlobalStartTiming(down[0]), machine, 1)
+    problem.add_increase_effect(GlobalStartTiming(down[1]), machine, 1)
+    repaired = engine.repair(
+        problem, result.plan, disruption_time=disruption_time, window=4
+    )
+    assert repaired.status == PlanGenerationResultStatus.SOLVED_SATISFICING
+    after = engine.converter.plan_start_times(repaired.plan)
+    names = np.array(instance.activity_names()).reshape(instance.machines.shape)
+    starts = np.vectorize(after.get)(names)
+    ends = starts + instance.durations
+    # Started activities are kept, the others start after the disruption.
+    for name, start in before.items():
+        if start < disruption_time:
+            assert after[name] == start
+        else:
+            assert after[name] >= disruption_time
+    assert (ends[:, :-1] <= starts[:, 1:]).all()
+    for m in range(instance.nb_machines):
+        intervals = sorted(
+            zip(starts[instance.machines == m], ends[instance.machines == m])
+        )
+        for (_, end), (start, _) in zip(intervals[:-1], intervals[1:]):
+            assert end <= start
+        if m == 0:
+            assert all(e <= down[0] or s >= down[1] for s, e in intervals)
+    # Only activities not started are in the reduced model.
+    assert engine.do_problem.n_jobs_non_dummy == sum(
+        start >= disruption_time for start in before.values()
+    )
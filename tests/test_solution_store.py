@@ -0,0 +1,72 @@
+import os
+
+os.environ["DO_SKIP_MZN_CHECK"] = "1"
+
+import numpy as np
+from discrete_optimization.generic_tools.cp_tools import ParametersCP
+from discrete_optimization.generic_tools.ea.ga_tools import ParametersGa
+from discrete_optimization.rcpsp.rcpsp_solvers import GA_RCPSP_Solver
+
+from up_discreteoptimization.engine_do import EngineDiscreteOptimization
+from up_discreteoptimization.loaders import JobShopInstance, job_shop_to_up
+from up_discreteoptimization.solution_store import SolutionStore, solver_key
+
+
+def small_parameters_ga() -> ParametersGa:
+    parameters_ga = ParametersGa.default_rcpsp()
+    parameters_ga.max_evals = 200
+    parameters_ga.deap_verbose = False
+    return parameters_ga
+
+
+def test_solver_key_of_rebuilt_parameters():
+    key = solver_key("GA", {"parameters_ga": small_parameters_ga(), "seed": 1})
+    assert "0x" not in key
+    assert key == solver_key("GA", {"seed": 1, "parameters_ga": small_parameters_ga()})
+    other = small_parameters_ga()
+    other.pop_size += 1
+    assert key != solver_key("GA", {"parameters_ga": other, "seed": 1})
+    assert solver_key("CP", {"parameters_cp": ParametersCP.default()}) == solver_key(
+        "CP", {"parameters_cp": ParametersCP.default()}
+    )
+
+
+def test_store_hit_across_runs(tmp_path):
+    instance = JobShopInstance(
+        machines=np.array([[0, 1, 2], [1, 2, 0], [2, 0, 1]]),
+        durations=np.array([[3, 2, 2], [2, 1, 4], [4, 3, 1]]),
+        name="js3",
+    )
+    path = str(tmp_path / "solutions.sqlite")
+    for run in range(2):
+        # A new engine and parameters object in each run, as in separate runs.
+        engine = EngineDiscreteOptimization(
+            solver_class=GA_RCPSP_Solver,
+            parameters_ga=small_parameters_ga(),
+            solution_store=path,
+        )
+        engine.skip_checks = True
+        result = engine.solve(job_shop_to_up(instance))
+        assert result.plan is not None
+        assert engine.store_hit == (run == 1)
+    assert len(SolutionStore(path)) == 1
+
+
+def test_store_keyed_by_conversion_options(tmp_path):
+    instance = JobShopInstance(
+        machines=np.array([[0, 1], [1, 0]]),
+        durations=np.array([[4, 2], [2, 6]]),
+        name="js2",
+    )
+    path = str(tmp_path / "solutions.sqlite")
+    options = [{}, {"time_resolution": 4}, {"horizon": 100}, {"scale_time": True}]
+    # The last run, with the options of the first one, is the only store hit.
+    runs = options + [{}]
+    for run, conversion_options in enumerate(runs):
+        engine = EngineDiscreteOptimization(
+            solution_store=path, reduce_precedences=True, **conversion_options
+        )
+        engine.skip_checks = True
+        engine.solve(job_shop_to_up(instance))
+        assert engine.store_hit == (run == len(runs) - 1)
+    assert len(SolutionStore(path)) == len(options)
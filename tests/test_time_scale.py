@@ -0,0 +1,68 @@
+import os
+
+os.environ["DO_SKIP_MZN_CHECK"] = "1"
+
+from unified_planning.model.scheduling import SchedulingProblem
+from unified_planning.shortcuts import LE
+
+from up_discreteoptimization.convert_problem import ConvertToDiscreteOptim
+
+
+def build_problem(durations, release_date: int = 20) -> SchedulingProblem:
+    # A chain of activities on a machine unavailable from 40 to 60, and one
+    # more activity on it with a release date.
+    problem = SchedulingProblem("scaled")
+    machine = problem.add_resource("m", capacity=1)
+    problem.add_decrease_effect(40, machine, 1)
+    problem.add_increase_effect(60, machine, 1)
+    activities = [
+        problem.add_activity(f"a{i}", duration=duration)
+        for i, duration in enumerate(durations)
+    ]
+    for activity in activities:
+        activity.uses(machine, 1)
+    for previous, activity in zip(activities[:-2], activities[1:-1]):
+        problem.add_constraint(LE(previous.end, activity.start))
+    activities[-1].add_release_date(release_date)
+    return problem
+
+
+def machine_intervals(converter, solution):
+    times = converter.schedule_times(solution)
+    nb_activities = len(times) // 2
+    return sorted(zip(times[:nb_activities], times[nb_activities:]))
+
+
+def test_scale_by_common_divisor():
+    problem = build_problem([10, 20, 30, 10])
+    exact = ConvertToDiscreteOptim(problem)
+    exact_model = exact.build_scheduling_problem_do()
+    scaled = ConvertToDiscreteOptim(problem, scale_time=True)
+    model = scaled.build_scheduling_problem_do()
+    assert (scaled.time_scale, scaled.time_rounding_error) == (10, 0)
+    durations = [model.mode_details[f"a{i}"][1]["duration"] for i in range(4)]
+    assert durations == [1, 2, 3, 1]
+    assert model.horizon * 10 <= exact_model.horizon + 10
+    # Same schedule once back in the time unit of the problem.
+    assert (
+        scaled.schedule_times(model.get_dummy_solution()).tolist()
+        == exact.schedule_times(exact_model.get_dummy_solution()).tolist()
+    )
+
+
+def test_coarsen_to_time_resolution():
+    problem = build_problem([7, 12, 5, 9], release_date=23)
+    converter = ConvertToDiscreteOptim(problem, time_resolution=5)
+    model = converter.build_scheduling_problem_do()
+    assert converter.time_scale == 5
+    assert 0 < converter.time_rounding_error < 5
+    solution = model.get_dummy_solution()
+    assert model.satisfy(solution)
+    intervals = machine_intervals(converter, solution)
+    # Back in the time unit of the problem, the schedule stays feasible : the
+    # machine runs one activity at a time, never between 40 and 60, and the
+    # release date holds.
+    for (_, end), (start, _) in zip(intervals[:-1], intervals[1:]):
+        assert end <= start
+    assert all(end <= 40 or start >= 60 for start, end in intervals)
+    assert converter.schedule_times(solution)[3] >= 23
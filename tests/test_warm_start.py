@@ -0,0 +1,34 @@
+import os
+
+os.environ["DO_SKIP_MZN_CHECK"] = "1"
+
+from discrete_optimization.generic_tools.ea.ga_tools import ParametersGa
+from discrete_optimization.rcpsp.rcpsp_solvers import (
+    GA_RCPSP_Solver,
+    LS_RCPSP_Solver,
+    solve,
+)
+
+from up_discreteoptimization.loaders import load_psplib, rcpsp_to_do
+from up_discreteoptimization.warm_start import solve_from_solution
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), "..", "examples")
+
+
+def test_ga_starts_from_solution():
+    problem = rcpsp_to_do(load_psplib(os.path.join(EXAMPLES, "j301_1.sm")))
+    solution = solve(
+        method=LS_RCPSP_Solver, rcpsp_model=problem, nb_iteration_max=2000
+    ).get_best_solution()
+    makespan = problem.evaluate(solution)["makespan"]
+    # A single generation, which random permutations alone hardly match.
+    parameters_ga = ParametersGa.default_rcpsp()
+    parameters_ga.pop_size = 10
+    parameters_ga.max_evals = 10
+    parameters_ga.deap_verbose = False
+    result = solve_from_solution(
+        GA_RCPSP_Solver, problem, {"parameters_ga": parameters_ga}, solution
+    )
+    best = result.get_best_solution()
+    assert problem.satisfy(best)
+    assert problem.evaluate(best)["makespan"] <= makespan
@@ -0,0 +1,221 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import time
+import traceback
+from typing import AsyncIterator, Optional, Tuple
+
+import unified_planning as up
+from unified_planning.engines import PlanGenerationResult, PlanGenerationResultStatus
+from unified_planning.model.scheduling import SchedulingProblem
+
+from up_discreteoptimization.convert_problem import build_schedule, index_timepoints
+
+logger = logging.getLogger(__name__)
+
+# Time the solve process is given to stop the processes it started once
+# cancelled, before its process group is killed.
+STOP_GRACE_PERIOD = 2.0
+# Time given on top of the timeout for the engine to return its result, solvers
+# may overrun their time limit (e.g. while compiling the numba functions).
+TIMEOUT_MARGIN = 30.0
+
+
+def _exit_on_signal(signum, frame):
+    # SystemExit runs the finally blocks of the engine, which kill the portfolio
+    # workers (each one in its own process group).
+    raise SystemExit(1)
+
+
+def _solve_worker(
+    engine: "up.engines.Engine",
+    problem: SchedulingProblem,
+    timeout: Optional[float],
+    anytime: bool,
+    connection: "multiprocessing.connection.Connection",
+):
+    if hasattr(os, "setpgrp"):
+        # Own process group, so that child processes (e.g. minizinc) are killed with it.
+        os.setpgrp()
+    signal.signal(signal.SIGTERM, _exit_on_signal)
+    # Plans are rebuilt and metrics reported in the parent process, only the
+    # times of the schedules are sent.
+    engine.lazy_plans = True
+    engine.metrics_callback = None
+    activities_sent = False
+    try:
+        if anytime:
+            results = engine.get_solutions(problem, timeout=timeout)
+        else:
+            results = iter([engine.solve(problem, timeout=timeout)])
+        for result in results:
+            times = None
+            if result.plan is not None:
+                if not activities_sent:
+                    names = [a.name for a in engine.converter.plan_activities]
+                    connection.send(("activities", names))
+                    activities_sent = True
+                times = engine.converter.schedule_times(engine.do_solution)
+            connection.send(("result", result.status, times, result.metrics))
+    except Exception:
+        connection.send(("error", traceback.format_exc()))
+    finally:
+        connection.close()
+
+
+def _set_done(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class SolveProcess:
+    """Engine solve running in a child process, whose results are read from a
+    pipe without blocking the event loop."""
+
+    def __init__(
+        self,
+        engine: "up.engines.Engine",
+        problem: SchedulingProblem,
+        timeout: Optional[float] = None,
+        anytime: bool = False,
+    ):
+        context = multiprocessing.get_context()
+        self.receiver, sender = context.Pipe(duplex=False)
+        # Not a daemon, the engine may start its own worker processes.
+        self.process = context.Process(
+            target=_solve_worker, args=(engine, problem, timeout, anytime, sender)
+        )
+        self.process.start()
+        # Only the child process holds the sending end, so that its exit is
+        # seen as the end of the pipe.
+        sender.close()
+
+    async def receive(self) -> Optional[Tuple]:
+        """Next message of the child process, None once it has exited."""
+        if not self.receiver.poll():
+            loop = asyncio.get_running_loop()
+            ready = loop.create_future()
+            try:
+                loop.add_reader(self.receiver.fileno(), _set_done, ready)
+            except NotImplementedError:
+                # Event loops without add_reader (e.g. proactor on Windows) wait
+                # in the default executor.
+                await loop.run_in_executor(None, self.receiver.poll, None)
+            else:
+                try:
+                    await ready
+                finally:
+                    loop.remove_reader(self.receiver.fileno())
+        try:
+            return self.receiver.recv()
+        except EOFError:
+            return None
+
+    def _signal(self, force: bool):
+        if hasattr(os, "killpg"):
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL if force else signal.SIGTERM)
+                return
+            except ProcessLookupError:
+                # Exited, or not yet in its own process group.
+                pass
+        if force:
+            self.process.kill()
+        else:
+            self.process.terminate()
+
+    async def stop(
+        self, grace_period: float = STOP_GRACE_PERIOD, finished: bool = False
+    ):
+        """Stops the child process, left to exit by itself if finished."""
+        if self.process.exitcode is None:
+            if not finished:
+                self._signal(force=False)
+            deadline = time.perf_counter() + grace_period
+            try:
+                while self.process.is_alive() and time.perf_counter() < deadline:
+                    await asyncio.sleep(0.05)
+            finally:
+                if self.process.is_alive():
+                    logger.info("Solve process still running, killing it")
+                    self._signal(force=True)
+        self.process.join()
+        self.receiver.close()
+
+
+async def solve_in_process(
+    engine: "up.engines.Engine",
+    problem: SchedulingProblem,
+    timeout: Optional[float] = None,
+    anytime: bool = False,
+) -> AsyncIterator[PlanGenerationResult]:
+    """Runs engine.solve, or engine.get_solutions if anytime, in a child process
+    and yields its results as they come, without blocking the event loop.
+
+    The child process works on a copy of the engine. It is stopped, with the
+    processes it started, when the generator is closed or its task cancelled,
+    and killed if no result comes within timeout (plus TIMEOUT_MARGIN).
+    """
+    deadline = (
+        None if timeout is None else time.perf_counter() + timeout + TIMEOUT_MARGIN
+    )
+    solve_process = SolveProcess(engine, problem, timeout, anytime)
+    activities = None
+    timepoint_index = None
+    nb_results = 0
+    finished = False
+    try:
+        while True:
+            remaining = None if deadline is None else deadline - time.perf_counter()
+            try:
+                message = await asyncio.wait_for(solve_process.receive(), remaining)
+            except asyncio.TimeoutError:
+                logger.info("No result from the solve process in time, stopping it")
+                if not anytime:
+                    yield PlanGenerationResult(
+                        PlanGenerationResultStatus.TIMEOUT, None, engine.name
+                    )
+                return
+            if message is None:
+                finished = True
+                if nb_results == 0:
+                    logger.error("The solve process exited without result")
+                    yield PlanGenerationResult(
+                        PlanGenerationResultStatus.INTERNAL_ERROR, None, engine.name
+                    )
+                return
+            if message[0] == "activities":
+                activity_map = {a.name: a for a in problem.activities}
+                activities = [activity_map[name] for name in message[1]]
+                timepoint_index = index_timepoints(activities)
+            elif message[0] == "error":
+                finished = True
+                logger.error(f"Solve failed in the child process\n{message[1]}")
+                yield PlanGenerationResult(
+                    PlanGenerationResultStatus.INTERNAL_ERROR, None, engine.name
+                )
+                return
+            else:
+                _, status, times, metrics = message
+                plan = (
+                    None
+                    if times is None
+                    else build_schedule(
+                        activities,
+                        timepoint_index,
+                        times,
+                        problem.environment,
+                        lazy=engine.lazy_plans,
+                    )
+                )
+                if metrics and engine.metrics_callback is not None:
+                    engine.metrics_callback(metrics)
+                nb_results += 1
+                finished = not anytime
+                yield PlanGenerationResult(status, plan, engine.name, metrics=metrics)
+                if not anytime:
+                    return
+    finally:
+        await solve_process.stop(finished=finished)
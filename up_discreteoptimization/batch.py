@@ -0,0 +1,122 @@
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from unified_planning.engines import PlanGenerationResultStatus
+from unified_planning.model.scheduling import SchedulingProblem
+
+from up_discreteoptimization.engine_do import EngineDiscreteOptimization
+
+logger = logging.getLogger(__name__)
+
+Instance = Union[SchedulingProblem, str]
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one instance of a batch solve.
+
+    The schedule maps each activity name to its (start, end) times, so that
+    results can be sent back from the worker processes. Times and makespan are
+    in the time unit of the problem.
+    """
+
+    index: int
+    name: str
+    status: PlanGenerationResultStatus
+    makespan: Optional[float] = None
+    schedule: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    load_time: float = 0.0
+    solve_time: float = 0.0
+    error: Optional[str] = None
+
+
+def _solve_instance(
+    index: int,
+    instance: Instance,
+    loader: Optional[Callable[[str], SchedulingProblem]],
+    timeout: Optional[float],
+    engine_kwargs: Dict[str, Any],
+) -> BatchResult:
+    name = instance if isinstance(instance, str) else instance.name
+    start = time.perf_counter()
+    try:
+        if isinstance(instance, str):
+            if loader is None:
+                raise ValueError(f"A loader is needed to read instance file {instance}")
+            problem = loader(instance)
+        else:
+            problem = instance
+        load_time = time.perf_counter() - start
+        with EngineDiscreteOptimization(**engine_kwargs) as planner:
+            planner.skip_checks = True
+            result = planner.solve(problem, timeout=timeout)
+            solution = planner.do_solution
+            makespan, schedule = None, {}
+            if solution is not None:
+                # Back in the time unit of the problem.
+                times = planner.converter.schedule_times(solution)
+                activities = planner.converter.plan_activities
+                makespan = int(times.max()) if len(times) > 0 else 0
+                schedule = {
+                    activity.name: (start, end)
+                    for activity, start, end in zip(
+                        activities,
+                        times[: len(activities)].tolist(),
+                        times[len(activities) :].tolist(),
+                    )
+                }
+        return BatchResult(
+            index=index,
+            name=name,
+            status=result.status,
+            makespan=makespan,
+            schedule=schedule,
+            load_time=load_time,
+            solve_time=time.perf_counter() - start - load_time,
+        )
+    except Exception as e:
+        logger.exception(f"Failed to solve instance {name}")
+        return BatchResult(
+            index=index,
+            name=name,
+            status=PlanGenerationResultStatus.INTERNAL_ERROR,
+            solve_time=time.perf_counter() - start,
+            error=repr(e),
+        )
+
+
+def solve_batch(
+    instances: Iterable[Instance],
+    loader: Optional[Callable[[str], SchedulingProblem]] = None,
+    max_workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+    **engine_kwargs: Any,
+) -> Iterator[BatchResult]:
+    """Solves many scheduling instances over a process pool.
+
+    Instances are SchedulingProblem objects or file paths, read in the workers
+    with loader (e.g. parse_jsplib). Each instance is converted and solved by an
+    EngineDiscreteOptimization built from engine_kwargs, with the given timeout.
+    Results are yielded in completion order.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _solve_instance, index, instance, loader, timeout, engine_kwargs
+            )
+            for index, instance in enumerate(instances)
+        ]
+        for future in as_completed(futures):
+            batch_result: BatchResult = future.result()
+            logger.info(
+                f"Instance {batch_result.name} : {batch_result.status.name}, "
+                f"makespan {batch_result.makespan}, "
+                f"{batch_result.load_time + batch_result.solve_time:.2f}s"
+            )
+            yield batch_result
@@ -0,0 +1,118 @@
+import logging
+import math
+from collections import deque
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+from discrete_optimization.rcpsp.rcpsp_model import RCPSPModel
+
+from up_discreteoptimization.jobshop import JobShopModel
+
+logger = logging.getLogger(__name__)
+
+
+def critical_path_bound(problem: RCPSPModel) -> int:
+    # Longest path of the precedence graph from the release dates, with the
+    # minimum delays of the generalized precedences, resources and calendars
+    # ignored.
+    durations: Dict[Hashable, int] = {
+        task: min(
+            problem.mode_details[task][mode]["duration"]
+            for mode in problem.mode_details[task]
+        )
+        for task in problem.tasks_list
+    }
+    # (successor, minimum delay between the starts) of each task.
+    edges: Dict[Hashable, List[Tuple[Hashable, int]]] = {
+        task: [(successor, durations[task]) for successor in problem.successors[task]]
+        for task in problem.tasks_list
+    }
+    earliest_start = {task: 0 for task in problem.tasks_list}
+    if problem.includes_special_constraint():
+        constraints = problem.special_constraints
+        for task, (lower, _) in constraints.start_times_window.items():
+            if lower is not None:
+                earliest_start[task] = max(earliest_start[task], lower)
+        for task1, task2 in constraints.start_at_end:
+            edges[task1].append((task2, durations[task1]))
+        for task1, task2, offset in constraints.start_at_end_plus_offset:
+            edges[task1].append((task2, durations[task1] + offset))
+        for task1, task2, offset in constraints.start_after_nunit:
+            edges[task1].append((task2, offset))
+    nb_predecessors = {task: 0 for task in problem.tasks_list}
+    for task in problem.tasks_list:
+        for successor, _ in edges[task]:
+            nb_predecessors[successor] += 1
+    queue = deque(task for task in problem.tasks_list if nb_predecessors[task] == 0)
+    makespan = 0
+    # Tasks on a cycle of the extended graph are left out, which keeps the
+    # bound valid.
+    while queue:
+        task = queue.popleft()
+        makespan = max(makespan, earliest_start[task] + durations[task])
+        for successor, delay in edges[task]:
+            earliest_start[successor] = max(
+                earliest_start[successor], earliest_start[task] + delay
+            )
+            nb_predecessors[successor] -= 1
+            if nb_predecessors[successor] == 0:
+                queue.append(successor)
+    return makespan
+
+
+def energy_bound(problem: RCPSPModel) -> int:
+    # For each renewable resource, first time at which the cumulated capacity
+    # covers the energy (duration x demand) of the tasks using it.
+    bound = 0
+    for resource in problem.resources_list:
+        if resource in problem.non_renewable_resources:
+            continue
+        energy = sum(
+            min(
+                problem.mode_details[task][mode]["duration"]
+                * problem.mode_details[task][mode].get(resource, 0)
+                for mode in problem.mode_details[task]
+            )
+            for task in problem.tasks_list
+        )
+        if energy == 0:
+            continue
+        capacity = problem.resources[resource]
+        if isinstance(capacity, int):
+            if capacity > 0:
+                bound = max(bound, math.ceil(energy / capacity))
+            continue
+        cumulated_capacity = np.cumsum(capacity)
+        if cumulated_capacity[-1] >= energy:
+            bound = max(bound, int(np.searchsorted(cumulated_capacity, energy)) + 1)
+    return bound
+
+
+def job_shop_bound(job_shop: JobShopModel) -> int:
+    # Longest job, and for each machine the first time at which its available
+    # time covers its load.
+    bound = max(
+        [0] + [sum(job_shop.duration[task] for task in job) for job in job_shop.jobs]
+    )
+    load: Dict[str, int] = {}
+    for task, machine in job_shop.machine.items():
+        load[machine] = load.get(machine, 0) + job_shop.duration[task]
+    for machine, machine_load in load.items():
+        end = machine_load
+        # Unavailability windows are sorted, each one starting before the
+        # machine could have completed its load delays it.
+        for start, stop in job_shop.unavailability[machine]:
+            if start < end:
+                end += stop - start
+        bound = max(bound, end)
+    return bound
+
+
+def makespan_lower_bound(
+    problem: RCPSPModel, job_shop: Optional[JobShopModel] = None
+) -> int:
+    bound = max(critical_path_bound(problem), energy_bound(problem))
+    if job_shop is not None:
+        bound = max(bound, job_shop_bound(job_shop))
+    logger.debug(f"Makespan lower bound {bound}")
+    return bound
@@ -0,0 +1,81 @@
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional
+
+from unified_planning.model.scheduling.scheduling_problem import SchedulingProblem
+
+logger = logging.getLogger(__name__)
+
+
+def problem_fingerprint(problem: SchedulingProblem, *extra: Any) -> str:
+    """Canonical hash of a scheduling problem.
+
+    Two problems built independently but with the same resources, activities,
+    durations, resource usages, constraints and base effects share the same
+    fingerprint. Every part is serialized and sorted so that the declaration
+    order does not matter. Extra values (e.g. a horizon override) are hashed too.
+    """
+    parts: List[str] = []
+    for fluent in problem.fluents:
+        parts.append(f"fluent|{fluent.name}|{fluent.type}")
+    for activity in problem.activities:
+        effects = sorted(
+            f"{timing}|{effect}"
+            for timing, effects in activity.effects.items()
+            for effect in effects
+        )
+        constraints = sorted(str(c) for c in activity.constraints)
+        parts.append(
+            f"activity|{activity.name}|{activity.duration}|"
+            f"{';'.join(effects)}|{';'.join(constraints)}"
+        )
+    for constraint in problem.base_constraints:
+        parts.append(f"constraint|{constraint}")
+    for timing, effect in problem.base_effects:
+        parts.append(f"effect|{timing}|{effect}")
+    for metric in problem.quality_metrics:
+        parts.append(f"metric|{metric}")
+    for value in extra:
+        parts.append(f"extra|{value}")
+    parts.sort()
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode())
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+class ConversionCache:
+    """Bounded LRU cache of converted problems, with hit/miss counters."""
+
+    def __init__(self, max_size: int = 32):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key: Hashable, value: Any):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
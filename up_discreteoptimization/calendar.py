@@ -0,0 +1,120 @@
+import bisect
+import logging
+from typing import List, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceCalendar:
+    """Availability of a resource over time, stored as a step function.
+
+    The calendar holds the capacity of the resource at time 0 and a sorted list
+    of change-points, each one giving the availability from that time onwards.
+    Memory only depends on the number of calendar events, dense arrays are
+    built with to_array() when a solver needs them.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity: int = capacity
+        self.change_times: List[int] = []
+        self.values: List[int] = []
+
+    @classmethod
+    def from_events(
+        cls, capacity: int, times: Sequence[int], deltas: Sequence[int]
+    ) -> "ResourceCalendar":
+        # Difference array over the distinct event times, followed by a single
+        # cumulative sum : O(E log E) whatever the horizon.
+        calendar = cls(capacity=capacity)
+        if len(times) == 0:
+            return calendar
+        change_times, inverse = np.unique(np.asarray(times), return_inverse=True)
+        steps = np.zeros(len(change_times), dtype=int)
+        np.add.at(steps, inverse, np.asarray(deltas, dtype=int))
+        calendar.change_times = change_times.tolist()
+        calendar.values = (capacity + np.cumsum(steps)).tolist()
+        return calendar
+
+    def add_delta(self, time: int, delta: int):
+        # Shift the availability by delta from time onwards.
+        index = bisect.bisect_left(self.change_times, time)
+        if index == len(self.change_times) or self.change_times[index] != time:
+            previous = self.values[index - 1] if index > 0 else self.capacity
+            self.change_times.insert(index, time)
+            self.values.insert(index, previous)
+        for i in range(index, len(self.values)):
+            self.values[i] += delta
+
+    def with_events(
+        self, times: Sequence[int], deltas: Sequence[int]
+    ) -> "ResourceCalendar":
+        # Copy of the calendar shifted by deltas from the given times onwards.
+        previous = [self.capacity] + self.values[:-1]
+        return ResourceCalendar.from_events(
+            capacity=self.capacity,
+            times=self.change_times + list(times),
+            deltas=[v - p for v, p in zip(self.values, previous)] + list(deltas),
+        )
+
+    def value_at(self, time: int) -> int:
+        index = bisect.bisect_right(self.change_times, time)
+        if index == 0:
+            return self.capacity
+        return self.values[index - 1]
+
+    def is_constant(self) -> bool:
+        return all(value == self.capacity for value in self.values)
+
+    def max_value(self) -> int:
+        return max([self.capacity] + self.values)
+
+    @property
+    def nb_events(self) -> int:
+        return len(self.change_times)
+
+    def coarsen(self, scale: int) -> "ResourceCalendar":
+        """Calendar over time slots of length scale, each slot getting the lowest
+        availability within it. Exact when all change times are multiples of scale."""
+
+        def slot_value(slot: int) -> int:
+            start = slot * scale
+            value = self.value_at(start)
+            index = bisect.bisect_right(self.change_times, start)
+            while (
+                index < len(self.change_times)
+                and self.change_times[index] < start + scale
+            ):
+                value = min(value, self.values[index])
+                index += 1
+            return value
+
+        calendar = ResourceCalendar(capacity=slot_value(0))
+        # The value of a slot only differs from the previous one in the slots
+        # containing a change, or just after them.
+        slots = {t // scale for t in self.change_times}
+        slots |= {t // scale + 1 for t in self.change_times}
+        slots.discard(0)
+        for slot in sorted(slots):
+            value = slot_value(slot)
+            previous = calendar.values[-1] if calendar.values else calendar.capacity
+            if value != previous:
+                calendar.change_times.append(slot)
+                calendar.values.append(value)
+        return calendar
+
+    def to_array(self, horizon: int) -> np.ndarray:
+        array = np.full(horizon, self.capacity, dtype=int)
+        bounds = self.change_times + [horizon]
+        for i in range(len(self.change_times)):
+            if bounds[i] >= horizon:
+                break
+            array[bounds[i] : min(bounds[i + 1], horizon)] = self.values[i]
+        return array
+
+    def __repr__(self) -> str:
+        return (
+            f"ResourceCalendar(capacity={self.capacity}, "
+            f"changes={list(zip(self.change_times, self.values))})"
+        )
@@ -1,9 +1,28 @@
+import copy
+import itertools
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+import math
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type, Union
 
 import numpy as np
 import unified_planning as up
+from discrete_optimization.generic_tools.cp_tools import CPSolver
+from discrete_optimization.generic_tools.do_solver import SolverDO
 from discrete_optimization.rcpsp.rcpsp_model import RCPSPModel, RCPSPSolution
+from discrete_optimization.rcpsp.rcpsp_solution import (
+    PartialSolution,
+    generate_schedule_from_permutation_serial_sgs_special_constraints,
+)
+from discrete_optimization.rcpsp.rcpsp_solvers import (
+    LNS_CP_RCPSP_SOLVER,
+    LargeNeighborhoodSearchRCPSP,
+)
+from discrete_optimization.rcpsp.special_constraints import (
+    SpecialConstraintsDescription,
+)
+from unified_planning.environment import Environment
 from unified_planning.model import (
     Effect,
     EffectKind,
@@ -11,18 +30,175 @@ from unified_planning.model import (
     FNode,
     OperatorKind,
     Timepoint,
+    TimepointKind,
     Timing,
 )
 from unified_planning.model.scheduling.scheduling_problem import (
     Activity,
     SchedulingProblem,
 )
+from unified_planning.plans import Schedule
+
+from up_discreteoptimization.calendar import ResourceCalendar
+from up_discreteoptimization.lazy_schedule import LazyAssignment, LazySchedule
+from up_discreteoptimization.precedence_graph import transitive_reduction
 
 logger = logging.getLogger(__name__)
 
+# Generalized precedences, named after the DO special constraints they map to.
+SPECIAL_RELATIONS = [
+    "start_together",
+    "start_at_end",
+    "start_at_end_plus_offset",
+    "start_after_nunit",
+]
+# Names of the dummy tasks added around the activities of the DO model.
+SOURCE_TASK = "source_"
+SINK_TASK = "sink_"
+
+
+def set_solver_special_constraints(
+    solver_class: Type[SolverDO], params_solver: Dict[str, Any], problem: RCPSPModel
+) -> Dict[str, Any]:
+    """Returns a copy of the solver parameters where the special constraints of the
+    problem are given as partial solution, which is how CP based solvers read them."""
+    if (
+        not problem.includes_special_constraint()
+        or "partial_solution" in params_solver
+        or not issubclass(
+            solver_class, (CPSolver, LNS_CP_RCPSP_SOLVER, LargeNeighborhoodSearchRCPSP)
+        )
+    ):
+        return params_solver
+    special_constraints = problem.special_constraints
+    params_solver = dict(params_solver)
+    params_solver["partial_solution"] = PartialSolution(
+        start_times_window=special_constraints.start_times_window,
+        end_times_window=special_constraints.end_times_window,
+        start_together=special_constraints.start_together,
+        start_at_end=special_constraints.start_at_end,
+        start_at_end_plus_offset=special_constraints.start_at_end_plus_offset,
+        start_after_nunit=special_constraints.start_after_nunit,
+    )
+    return params_solver
+
+
+def special_constraints_sgs(problem: RCPSPModel) -> Callable:
+    """Serial SGS of DO honouring the generalized precedences of the special
+    constraints (start together, start at end, offsets), with the signature of
+    the compiled one (problem.func_sgs) which only reads the release dates.
+    It runs in Python, so it is only used when there are such precedences."""
+
+    def func_sgs(permutation_task: np.ndarray, modes_array: np.ndarray):
+        tasks = [problem.tasks_list[i] for i in permutation_task[1:-1]]
+        # The DO SGS only reads the permutation and modes of the solution.
+        solution = SimpleNamespace(
+            rcpsp_permutation=[problem.index_task_non_dummy[t] for t in tasks],
+            rcpsp_modes=[
+                int(modes_array[problem.index_task[t]]) + 1
+                for t in problem.tasks_list_non_dummy
+            ],
+        )
+        (
+            schedule,
+            feasible,
+        ) = generate_schedule_from_permutation_serial_sgs_special_constraints(
+            solution=solution, rcpsp_problem=problem
+        )
+        return {
+            problem.index_task[task]: (times["start_time"], times["end_time"])
+            for task, times in schedule.items()
+        }, not feasible
+
+    return func_sgs
+
+
+def horizon_bound(
+    durations: Iterable[int],
+    release_dates: Iterable[int] = (),
+    deadlines: Iterable[int] = (),
+    last_event: int = 0,
+    total_offset: int = 0,
+) -> int:
+    # Scheduling every activity one after the other once all calendar events
+    # and release dates are passed is always possible, so the sum of durations
+    # after that date is a safe bound on the makespan. Offsets of generalized
+    # precedences may delay each task a bit more.
+    horizon = max([last_event] + list(release_dates)) + total_offset + sum(durations)
+    return max([horizon] + list(deadlines)) + 1
+
+
+def build_special_constraints(
+    release_dates: Dict[str, int],
+    deadlines: Dict[str, int],
+    special_relations: Optional[Dict[str, Counter]] = None,
+) -> Optional[SpecialConstraintsDescription]:
+    # None when there is nothing to add to the precedence graph, the DO model
+    # then keeps its faster schedule generation.
+    special_relations = special_relations or {}
+    release_dates = {t: v for t, v in release_dates.items() if v > 0}
+    if (
+        len(release_dates) == 0
+        and len(deadlines) == 0
+        and not any(special_relations.values())
+    ):
+        return None
+    return SpecialConstraintsDescription(
+        start_times_window={t: (v, None) for t, v in release_dates.items()},
+        end_times_window={t: (None, v) for t, v in deadlines.items()},
+        **{
+            relation: list(special_relations.get(relation, []))
+            for relation in SPECIAL_RELATIONS
+        },
+    )
+
+
+def index_timepoints(activities: List[Activity]) -> Dict[Timepoint, int]:
+    # Start timepoints first, then end timepoints, as in schedule_times.
+    timepoint_index = {a.start: i for i, a in enumerate(activities)}
+    timepoint_index.update(
+        (a.end, len(activities) + i) for i, a in enumerate(activities)
+    )
+    return timepoint_index
+
+
+def build_schedule(
+    activities: List[Activity],
+    timepoint_index: Dict[Timepoint, int],
+    times: np.ndarray,
+    environment: Environment,
+    lazy: bool = False,
+) -> Schedule:
+    """UP schedule of the activities, the time of each timepoint being read from
+    times at its position in timepoint_index (see index_timepoints). If lazy, the
+    expressions of the times are only built when they are accessed."""
+    if lazy:
+        return LazySchedule(
+            activities=activities,
+            assignment=LazyAssignment(timepoint_index, times, environment),
+            environment=environment,
+        )
+    # One constant expression per distinct time, shared by the timepoints.
+    distinct_times = np.unique(times).tolist()
+    constants = dict(
+        zip(distinct_times, map(environment.expression_manager.Int, distinct_times))
+    )
+    schedule = Schedule(activities=activities, environment=environment)
+    schedule.assignment.update(
+        zip(timepoint_index, map(constants.__getitem__, times.tolist()))
+    )
+    return schedule
+
 
 class ConvertToDiscreteOptim:
-    def __init__(self, problem: SchedulingProblem):
+    def __init__(
+        self,
+        problem: SchedulingProblem,
+        horizon: Optional[int] = None,
+        reduce_precedences: bool = False,
+        scale_time: bool = False,
+        time_resolution: Optional[int] = None,
+    ):
         self.problem: SchedulingProblem = problem
         self.activity_list: List[Activity] = problem.activities
         self.activity_map = {a.name: a for a in self.activity_list}
@@ -31,121 +207,898 @@ class ConvertToDiscreteOptim:
         self.constraint_list = problem.all_constraints()
         self.initial_values_map = problem.explicit_initial_values
         self.original_resource_set_of_resource_set = {}
+        self.calendars: Dict[str, ResourceCalendar] = {}
+        # If given, horizon overrides the value computed from the instance.
+        self.horizon: Optional[int] = horizon
+        # If True, redundant precedence edges are removed before building the model,
+        # nb_removed_edges then counts the edges saved.
+        self.reduce_precedences = reduce_precedences
+        self.nb_removed_edges = 0
+        # If scale_time, times are divided by their greatest common divisor in the
+        # DO model. If time_resolution is given, they are also rounded to multiples
+        # of it when it is larger (lossy), the schedule staying feasible except for
+        # the "start together" and "start at end" relations, which may be off
+        # by time_rounding_error.
+        self.scale_time = scale_time or time_resolution is not None
+        self.time_resolution = time_resolution
+        self.time_scale = 1
+        self.time_rounding_error = 0
+        # Converter whose indices are expressed in the time unit of the DO model.
+        self.scaled: ConvertToDiscreteOptim = self
+        self.release_dates: Dict[str, int] = {}
+        self.deadlines: Dict[str, int] = {}
+        # Intermediate indices, kept so that the DO model can be updated
+        # incrementally when the problem is edited.
+        self.source_task = SOURCE_TASK
+        self.sink_task = SINK_TASK
+        self.capacity_resource: Dict[str, int] = {}
+        self.calendar_events: Dict[str, Counter] = {}
+        self.mode_details: Dict[
+            str, Dict[int, Dict[str, int]]
+        ] = {}  # {Task name: {mode: {"duration": , "resource"...}}
+        self.successors: Dict[str, List[str]] = {}
+        self.task_activities: Dict[str, Activity] = {}
+        self.start_var_to_activity: Dict[Timepoint, Activity] = {}
+        self.end_var_to_activity: Dict[Timepoint, Activity] = {}
+        # Parsed form of each constraint of the problem (None if ignored),
+        # and constraints attached to each activity.
+        self.constraint_records: Dict[FNode, Optional[Tuple]] = {}
+        self.constraints_of_activity: Dict[str, List[FNode]] = {}
+        # What was read from each activity and from the base constraints, so that
+        # updates spot the activities edited in place and the constraints added.
+        self.activity_signatures: Dict[str, Tuple] = {}
+        self.base_constraints: List[FNode] = []
+        # {relation: Counter of (task1, task2) or (task1, task2, offset)}
+        self.special_relations: Dict[str, Counter] = {
+            relation: Counter() for relation in SPECIAL_RELATIONS
+        }
+        # Activities in the order of the DO tasks, with their timepoints and
+        # exact durations, so that plans are built in bulk.
+        self.plan_activities: List[Activity] = []
+        self.plan_durations: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.timepoint_index: Dict[Timepoint, int] = {}
 
-    def build_scheduling_problem_do(self):
-        # COMPUTE RESOURCE AND CALENDARS
-        fluents: List["up.model.fluent.Fluent"] = self.problem.fluents
+    def rebind(self, problem: SchedulingProblem) -> "ConvertToDiscreteOptim":
+        # Copy of this converter attached to a structurally identical problem,
+        # so that the plan is expressed with the activities of that problem.
+        converter = copy.copy(self)
+        converter.problem = problem
+        converter.activity_list = problem.activities
+        converter.activity_map = {a.name: a for a in converter.activity_list}
+        converter.resource_list = problem.fluents
+        converter.metric_list = problem.quality_metrics
+        converter.constraint_list = problem.all_constraints()
+        converter.initial_values_map = problem.explicit_initial_values
+        converter.start_var_to_activity = {a.start: a for a in converter.activity_list}
+        converter.end_var_to_activity = {a.end: a for a in converter.activity_list}
+        converter.task_activities = dict(converter.activity_map)
+        # Indices updated in place by update_scheduling_problem_do are copied.
+        converter.mode_details = dict(self.mode_details)
+        converter.successors = {t: list(s) for t, s in self.successors.items()}
+        converter.constraints_of_activity = {
+            t: list(c) for t, c in self.constraints_of_activity.items()
+        }
+        converter.constraint_records = dict(self.constraint_records)
+        converter.release_dates = dict(self.release_dates)
+        converter.deadlines = dict(self.deadlines)
+        converter.special_relations = {
+            relation: Counter(pairs)
+            for relation, pairs in self.special_relations.items()
+        }
+        converter.calendars = dict(self.calendars)
+        converter.activity_signatures = {
+            a.name: self._activity_signature(a) for a in converter.activity_list
+        }
+        converter.base_constraints = problem.base_constraints
+        converter._index_activities()
+        return converter
+
+    def compute_horizon(self, mode_details: Dict[str, Dict[int, Dict[str, int]]]):
+        if self.horizon is not None:
+            return self.horizon
+        return horizon_bound(
+            durations=(
+                max(mode_details[t][m]["duration"] for m in mode_details[t])
+                for t in mode_details
+            ),
+            release_dates=self.release_dates.values(),
+            deadlines=self.deadlines.values(),
+            last_event=max(
+                [0]
+                + [c.change_times[-1] for c in self.calendars.values() if c.nb_events]
+            ),
+            total_offset=sum(
+                key[2]
+                for relation in ["start_at_end_plus_offset", "start_after_nunit"]
+                for key in self.special_relations[relation]
+            ),
+        )
 
+    def build_resources(self, horizon: int) -> Dict[str, Union[int, np.ndarray]]:
+        # When every calendar is constant, resources are given as a single capacity.
+        # Otherwise the DO model expects one availability array per resource,
+        # so the dense arrays are only materialized in that case.
+        if all(self.calendars[r].is_constant() for r in self.calendars):
+            return {r: self.calendars[r].capacity for r in self.calendars}
+        return {r: self.calendars[r].to_array(horizon) for r in self.calendars}
+
+    def _update_calendars(self):
+        fluents: List["up.model.fluent.Fluent"] = self.problem.fluents
         capacity_resource = {}
-        resource_set = set()
         for r in fluents:
             if r.type.is_int_type():
-                resource_set.add(r.name)
                 capacity_resource[r.name] = r.type.upper_bound
-        calendar_resource = {
-            r: capacity_resource[r] * np.ones(100000) for r in capacity_resource
-        }
+        # Bucket the calendar events per resource
+        events_resource: Dict[str, Counter] = {r: Counter() for r in capacity_resource}
         base_effects: List[Tuple[Timing, Effect]] = self.problem.base_effects
         for time, effect in base_effects:
             fnode: FNode = effect.fluent
             actual_fluent: Fluent = fnode.fluent()
             name_fluent = actual_fluent.name
-            if name_fluent in calendar_resource:
+            if name_fluent in events_resource:
                 if effect.kind == EffectKind.DECREASE:
-                    # assert effect.value.is_constant()
-                    # assert effect.value.constant_value()
-                    calendar_resource[name_fluent][
-                        time.delay :
-                    ] -= effect.value.constant_value()
+                    events_resource[name_fluent][
+                        (time.delay, -effect.value.constant_value())
+                    ] += 1
                 if effect.kind == EffectKind.INCREASE:
-                    calendar_resource[name_fluent][
-                        time.delay :
-                    ] += effect.value.constant_value()
+                    events_resource[name_fluent][
+                        (time.delay, effect.value.constant_value())
+                    ] += 1
+        # Only calendars whose capacity or events changed are (re)built, in one pass.
+        for r in capacity_resource:
+            if (
+                r in self.calendars
+                and self.capacity_resource.get(r) == capacity_resource[r]
+                and self.calendar_events.get(r) == events_resource[r]
+            ):
+                continue
+            events = list(events_resource[r].elements())
+            self.calendars[r] = ResourceCalendar.from_events(
+                capacity=capacity_resource[r],
+                times=[time for time, _ in events],
+                deltas=[delta for _, delta in events],
+            )
+        for r in list(self.calendars):
+            if r not in capacity_resource:
+                self.calendars.pop(r)
+        self.capacity_resource = capacity_resource
+        self.calendar_events = events_resource
 
-        # DEFINE Tasks data
-        from unified_planning.model import Parameter
+    @staticmethod
+    def _activity_signature(activity: Activity) -> Tuple:
+        # UP replaces the duration interval of an activity when it is set, and
+        # only appends to its effects and constraints.
+        return (
+            activity,
+            activity.duration,
+            sum(len(effects) for effects in activity.effects.values()),
+            len(activity.constraints),
+        )
 
-        set_name_activities = set()
-        activities: List[Activity] = self.problem.activities
-        start_var_to_activity: Dict[Timepoint, Activity] = {}
-        end_var_to_activity: Dict[Timepoint, Activity] = {}
-        mode_details: Dict[
-            str, Dict[int, Dict[str, int]]
-        ] = {}  # {Task name: {mode: {"duration": , "resource"...}}
-        for activity in activities:
-            name_activity = activity.name
-            mode_details[name_activity] = {1: {}}
-            duration_upper = activity.duration.upper.constant_value()
-            duration_lower = activity.duration.lower.constant_value()
-            assert duration_lower == duration_upper
-            mode_details[name_activity][1]["duration"] = int(duration_lower)
-            effects_var: Dict[
-                "up.model.timing.Timing", List["up.model.effect.Effect"]
-            ] = activity.effects
-            for timing in effects_var:
-                if timing.timepoint == activity.start and timing.delay == 0:
-                    # Starting effect
-                    effects_starts: List[Effect] = effects_var[timing]
-                    for eff in effects_starts:
-                        resource_consume = eff.fluent.fluent().name
-                        if eff.kind == EffectKind.DECREASE:
-                            mode_details[name_activity][1][resource_consume] = int(
-                                eff.value.type.upper_bound
-                            )
-            set_name_activities.add(name_activity)
-            start_var_to_activity[activity.start] = activity
-            end_var_to_activity[activity.end] = activity
+    @staticmethod
+    def _read_modes(activity: Activity) -> Dict[int, Dict[str, int]]:
+        details = {}
+        duration_upper = activity.duration.upper.constant_value()
+        duration_lower = activity.duration.lower.constant_value()
+        assert duration_lower == duration_upper
+        details["duration"] = int(duration_lower)
+        effects_var: Dict[
+            "up.model.timing.Timing", List["up.model.effect.Effect"]
+        ] = activity.effects
+        for timing in effects_var:
+            if timing.timepoint == activity.start and timing.delay == 0:
+                # Starting effect
+                effects_starts: List[Effect] = effects_var[timing]
+                for eff in effects_starts:
+                    resource_consume = eff.fluent.fluent().name
+                    if eff.kind == EffectKind.DECREASE:
+                        details[resource_consume] = int(eff.value.type.upper_bound)
+        return {1: details}
 
-        all_constraints: List[
-            Tuple[FNode, Optional[Activity]]
-        ] = self.problem.all_constraints()
-        # Defines precedence constraints.
-        successors = {task: [] for task in set_name_activities}
-        for constraint in all_constraints:
-            fnode = constraint[0]
-            if len(fnode.args) == 2 and fnode.node_type == OperatorKind.LE:
-                # Is probably a classical precedence constraint.
-                if (
-                    fnode.args[1].timing().delay == 0
-                    and fnode.args[0].timing().delay == 0
-                ):
-                    arg0 = fnode.args[0].timing().timepoint
-                    arg1 = fnode.args[1].timing().timepoint
-                    if arg0 in end_var_to_activity and arg1 in start_var_to_activity:
-                        act0_name = end_var_to_activity[arg0].name
-                        act1_name = start_var_to_activity[arg1].name
-                        successors[act0_name].append(act1_name)
-        source_task = "source_"
-        sink_task = "sink_"
+    def _add_activity(self, activity: Activity):
+        name_activity = activity.name
+        self.mode_details[name_activity] = self._read_modes(activity)
+        self.activity_signatures[name_activity] = self._activity_signature(activity)
+        self.successors[name_activity] = []
+        self.constraints_of_activity[name_activity] = []
+        self.task_activities[name_activity] = activity
+        self.start_var_to_activity[activity.start] = activity
+        self.end_var_to_activity[activity.end] = activity
+
+    def _remove_activity(self, name_activity: str):
+        for fnode in list(self.constraints_of_activity[name_activity]):
+            self._remove_constraint(fnode)
+        activity = self.task_activities.pop(name_activity)
+        self.start_var_to_activity.pop(activity.start)
+        self.end_var_to_activity.pop(activity.end)
+        self.mode_details.pop(name_activity)
+        self.successors.pop(name_activity)
+        self.constraints_of_activity.pop(name_activity)
+        self.activity_signatures.pop(name_activity)
+        self.release_dates.pop(name_activity, None)
+        self.deadlines.pop(name_activity, None)
+
+    def _update_activity(self, activity: Activity) -> bool:
+        """Reads again an activity edited in place, False if it can not be done
+        incrementally (constraints removed from it)."""
+        name_activity = activity.name
+        _, duration, nb_effects, nb_constraints = self.activity_signatures[
+            name_activity
+        ]
+        constraints = activity.constraints
+        if len(constraints) < nb_constraints:
+            return False
+        self.activity_signatures[name_activity] = self._activity_signature(activity)
+        if (
+            activity.duration is not duration
+            or self.activity_signatures[name_activity][2] != nb_effects
+        ):
+            modes = self._read_modes(activity)
+            if modes != self.mode_details[name_activity]:
+                self.mode_details[name_activity] = modes
+                # Constraints read with the duration of the activity.
+                for fnode in list(self.constraints_of_activity[name_activity]):
+                    self._remove_constraint(fnode)
+                    self._add_constraint(fnode)
+        for fnode in constraints[nb_constraints:]:
+            if fnode not in self.constraint_records:
+                self._add_constraint(fnode)
+        return True
+
+    def _parse_time_expression(
+        self, fnode: FNode
+    ) -> Optional[Tuple[Optional[str], bool, int]]:
+        # (activity, is_end, delay) for a timepoint of an activity plus a delay,
+        # activity is None for an absolute date.
+        if fnode.is_int_constant():
+            return None, False, fnode.constant_value()
+        if not fnode.is_timing_exp():
+            return None
+        timing: Timing = fnode.timing()
+        if int(timing.delay) != timing.delay:
+            return None
+        delay = int(timing.delay)
+        if timing.timepoint in self.start_var_to_activity:
+            return self.start_var_to_activity[timing.timepoint].name, False, delay
+        if timing.timepoint in self.end_var_to_activity:
+            return self.end_var_to_activity[timing.timepoint].name, True, delay
+        if timing.timepoint.kind == TimepointKind.GLOBAL_START:
+            return None, False, delay
+        return None
+
+    def _duration(self, name_activity: str) -> int:
+        return self.mode_details[name_activity][1]["duration"]
+
+    def _classify_constraint(self, fnode: FNode) -> Optional[Tuple]:
+        """Parsed form (kind, activities, value) of a temporal constraint
+        between two activities or between an activity and a date,
+        None if the constraint is not supported.
+        """
+        if len(fnode.args) != 2 or fnode.node_type not in {
+            OperatorKind.LE,
+            OperatorKind.LT,
+            OperatorKind.EQUALS,
+        }:
+            return None
+        left = self._parse_time_expression(fnode.args[0])
+        right = self._parse_time_expression(fnode.args[1])
+        if left is None or right is None:
+            return None
+        activity0, is_end0, delay0 = left
+        activity1, is_end1, delay1 = right
+        if fnode.node_type == OperatorKind.LT:
+            # Integer dates : x < y is x + 1 <= y
+            delay0 += 1
+        if fnode.node_type == OperatorKind.EQUALS:
+            if activity0 is None or activity1 is None or delay0 != delay1:
+                return None
+            if activity0 == activity1:
+                return None
+            if not is_end0 and not is_end1:
+                return "start_together", (activity0, activity1), None
+            if is_end0 and not is_end1:
+                return "start_at_end", (activity0, activity1), None
+            if is_end1 and not is_end0:
+                return "start_at_end", (activity1, activity0), None
+            return None
+        if activity0 is None and activity1 is None:
+            return None
+        # Bounds on the end of an activity are turned into bounds on its start,
+        # or conversely, with its fixed duration.
+        if activity0 is None:
+            # Release date : date <= timepoint + delay
+            date = delay0 - delay1
+            if is_end1:
+                date -= self._duration(activity1)
+            return "release", (activity1,), date
+        if activity1 is None:
+            # Deadline : timepoint + delay <= date
+            date = delay1 - delay0
+            if not is_end0:
+                date += self._duration(activity0)
+            return "deadline", (activity0,), date
+        if activity0 == activity1:
+            return None
+        if is_end0 and not is_end1 and delay0 >= delay1:
+            if delay0 == delay1:
+                # Classical precedence constraint : end <= start
+                return "precedence", (activity0, activity1), None
+            return (
+                "start_at_end_plus_offset",
+                (activity0, activity1),
+                delay0 - delay1,
+            )
+        # Any other precedence, as start0 + offset <= start1
+        offset = delay0 - delay1
+        if is_end0:
+            offset += self._duration(activity0)
+        if is_end1:
+            offset -= self._duration(activity1)
+        if offset < 0:
+            return None
+        return "start_after_nunit", (activity0, activity1), offset
+
+    def _add_constraint(self, fnode: FNode):
+        record = self._classify_constraint(fnode)
+        self.constraint_records[fnode] = record
+        if record is None:
+            logger.warning(
+                f"Constraint {fnode} ignored : only bounds by a date, precedences "
+                "with a non negative offset and equalities of two timepoints "
+                "are supported"
+            )
+            return
+        kind, activities, value = record
+        if kind == "release":
+            self.release_dates[activities[0]] = max(
+                value, self.release_dates.get(activities[0], value)
+            )
+        elif kind == "deadline":
+            self.deadlines[activities[0]] = min(
+                value, self.deadlines.get(activities[0], value)
+            )
+        elif kind == "precedence":
+            self.successors[activities[0]].append(activities[1])
+        else:
+            self.special_relations[kind][self._relation_key(activities, value)] += 1
+        for name_activity in activities:
+            self.constraints_of_activity[name_activity].append(fnode)
+
+    @staticmethod
+    def _relation_key(activities: Tuple[str, ...], value: Optional[int]) -> Tuple:
+        return activities if value is None else activities + (value,)
+
+    def _remove_constraint(self, fnode: FNode):
+        record = self.constraint_records.pop(fnode)
+        if record is None:
+            return
+        kind, activities, value = record
+        for name_activity in activities:
+            self.constraints_of_activity[name_activity].remove(fnode)
+        if kind == "precedence":
+            self.successors[activities[0]].remove(activities[1])
+        elif kind in {"release", "deadline"}:
+            # Recompute the bound from the remaining constraints of the activity.
+            name_activity = activities[0]
+            values = [
+                self.constraint_records[f][2]
+                for f in self.constraints_of_activity[name_activity]
+                if self.constraint_records[f][0] == kind
+            ]
+            bounds = self.release_dates if kind == "release" else self.deadlines
+            if len(values) == 0:
+                bounds.pop(name_activity)
+            else:
+                bounds[name_activity] = (
+                    max(values) if kind == "release" else min(values)
+                )
+        else:
+            key = self._relation_key(activities, value)
+            self.special_relations[kind][key] -= 1
+            if self.special_relations[kind][key] == 0:
+                del self.special_relations[kind][key]
+
+    def build_special_constraints(self) -> Optional[SpecialConstraintsDescription]:
+        return build_special_constraints(
+            self.release_dates, self.deadlines, self.special_relations
+        )
+
+    def reduce_precedence_graph(self) -> Dict[str, List[str]]:
+        # Transitive reduction of the precedence graph, the source and sink tasks
+        # are only linked to the activities without predecessors or successors.
+        successors, nb_removed = transitive_reduction(self.successors)
+        has_predecessor = {t for task in successors for t in successors[task]}
+        roots = [t for t in successors if t not in has_predecessor]
+        for task in successors:
+            if len(successors[task]) == 0:
+                successors[task] = [self.sink_task]
+        successors[self.source_task] = roots
+        nb_leaves = sum(successors[t] == [self.sink_task] for t in self.successors)
+        self.nb_removed_edges = (
+            nb_removed + 2 * len(self.successors) - len(roots) - nb_leaves
+        )
+        logger.info(
+            f"Precedence graph reduced, {self.nb_removed_edges} edges removed "
+            f"({nb_removed} redundant precedences)"
+        )
+        return successors
+
+    def compute_time_scale(self) -> int:
+        if not self.scale_time:
+            return 1
+        times = [
+            details["duration"]
+            for modes in self.mode_details.values()
+            for details in modes.values()
+        ]
+        for calendar in self.calendars.values():
+            times.extend(calendar.change_times)
+        times.extend(self.release_dates.values())
+        times.extend(self.deadlines.values())
+        for relation in ["start_at_end_plus_offset", "start_after_nunit"]:
+            times.extend(key[2] for key in self.special_relations[relation])
+        if self.horizon is not None:
+            times.append(self.horizon)
+        scale = math.gcd(*times) if times else 0
+        if self.time_resolution is not None:
+            scale = max(scale, self.time_resolution)
+        return max(scale, 1)
+
+    def rescale_time(self, scale: int) -> "ConvertToDiscreteOptim":
+        """Copy of the converter indices with times divided by scale. Durations,
+        release dates and offsets are rounded up, deadlines down, and calendars
+        keep the lowest availability of each time slot."""
+        converter = copy.copy(self)
+        error = 0
+
+        def scale_up(value: int) -> int:
+            nonlocal error
+            scaled = -(-value // scale)
+            error = max(error, scaled * scale - value)
+            return scaled
+
+        def scale_down(value: int) -> int:
+            nonlocal error
+            error = max(error, value % scale)
+            return value // scale
+
+        converter.mode_details = {
+            task: {
+                mode: {
+                    **details,
+                    "duration": scale_up(details["duration"]),
+                }
+                for mode, details in modes.items()
+            }
+            for task, modes in self.mode_details.items()
+        }
+        converter.release_dates = {
+            t: scale_up(v) for t, v in self.release_dates.items()
+        }
+        converter.deadlines = {t: scale_down(v) for t, v in self.deadlines.items()}
+        converter.special_relations = {
+            relation: Counter(
+                {
+                    key if len(key) == 2 else (key[0], key[1], scale_up(key[2])): n
+                    for key, n in pairs.items()
+                }
+            )
+            for relation, pairs in self.special_relations.items()
+        }
+        converter.calendars = {}
+        for resource, calendar in self.calendars.items():
+            for time in calendar.change_times:
+                scale_up(time)
+            converter.calendars[resource] = calendar.coarsen(scale)
+        if self.horizon is not None:
+            converter.horizon = scale_up(self.horizon)
+        converter.time_rounding_error = error
+        return converter
+
+    def _emit_model(self, time_scale: Optional[int] = None) -> RCPSPModel:
+        if time_scale is None:
+            time_scale = self.compute_time_scale()
+        if time_scale > 1:
+            self.scaled = self.rescale_time(time_scale)
+            self.time_scale = time_scale
+            self.time_rounding_error = self.scaled.time_rounding_error
+            if self.time_rounding_error > 0:
+                logger.warning(
+                    f"Times rounded to multiples of {time_scale}, "
+                    f"by at most {self.time_rounding_error}"
+                )
+            else:
+                logger.info(f"Times divided by {time_scale}")
+            scheduling_problem = self.scaled._emit_model(time_scale=1)
+            self.nb_removed_edges = self.scaled.nb_removed_edges
+            return scheduling_problem
+        self.scaled = self
+        self.time_scale = 1
+        self.time_rounding_error = 0
+        source_task = self.source_task
+        sink_task = self.sink_task
+        mode_details = dict(self.mode_details)
         mode_details[source_task] = {1: {"duration": 0}}
         mode_details[sink_task] = {1: {"duration": 0}}
-        successors[source_task] = list(set_name_activities)
+        if self.reduce_precedences:
+            successors = self.reduce_precedence_graph()
+        else:
+            successors = {
+                task: self.successors[task] + [sink_task] for task in self.successors
+            }
+            successors[source_task] = list(self.mode_details)
         successors[sink_task] = []
-        for k in set_name_activities:
-            successors[k].append(sink_task)
-        tasks_list = [source_task] + list(set_name_activities) + [sink_task]
-
-        # Deadline and release are put in activity.constraints : ((start_0, GlobalTiming(10)), <=) -> TODO
-        return RCPSPModel(
+        tasks_list = [source_task] + list(self.mode_details) + [sink_task]
+        horizon = self.compute_horizon(mode_details)
+        calendar_resource = self.build_resources(horizon=horizon)
+        special_constraints = self.build_special_constraints()
+        scheduling_problem = RCPSPModel(
             resources=calendar_resource,
             non_renewable_resources=[],
             mode_details=mode_details,
             successors=successors,
-            horizon=100000,
+            horizon=horizon,
             tasks_list=tasks_list,
             source_task=source_task,
             sink_task=sink_task,
+            special_constraints=special_constraints,
+        )
+        if special_constraints is not None:
+            # The schedule generation is compiled before the special constraints
+            # are known, it is rebuilt with their release dates and extra edges.
+            scheduling_problem.update_functions()
+            if any(self.special_relations.values()):
+                scheduling_problem.func_sgs = special_constraints_sgs(
+                    scheduling_problem
+                )
+        return scheduling_problem
+
+    def build_scheduling_problem_do(self) -> RCPSPModel:
+        self.build_indices()
+        return self._emit_model()
+
+    def build_indices(self):
+        # COMPUTE RESOURCE AND CALENDARS
+        self.capacity_resource = {}
+        self.calendar_events = {}
+        self.calendars = {}
+        self._update_calendars()
+
+        # DEFINE Tasks data
+        self.mode_details = {}
+        self.successors = {}
+        self.start_var_to_activity = {}
+        self.end_var_to_activity = {}
+        self.task_activities = {}
+        self.constraints_of_activity = {}
+        self.activity_signatures = {}
+        for activity in self.problem.activities:
+            self._add_activity(activity)
+
+        # Defines precedence constraints, release dates, deadlines and
+        # generalized precedences, in one pass over the constraints.
+        self.constraint_records = {}
+        self.release_dates = {}
+        self.deadlines = {}
+        self.special_relations = {relation: Counter() for relation in SPECIAL_RELATIONS}
+        all_constraints: List[
+            Tuple[FNode, Optional[Activity]]
+        ] = self.problem.all_constraints()
+        for fnode, _ in all_constraints:
+            if fnode not in self.constraint_records:
+                self._add_constraint(fnode)
+        self.base_constraints = self.problem.base_constraints
+        self._index_activities()
+
+    def update_scheduling_problem_do(
+        self, edited_activities: Optional[Iterable[Activity]] = None
+    ) -> RCPSPModel:
+        """Rebuilds the DO model after activities, constraints or base effects were
+        added to or removed from the problem, or activities edited in place, only
+        processing what changed since the last conversion.
+
+        Every activity is checked for in-place edits (duration, resource uses and
+        constraints), unless the edited ones are given as edited_activities, the
+        update then only reading them and what was appended to the problem. The
+        DO model itself is always emitted whole.
+        """
+        self.update_indices(edited_activities)
+        return self._emit_model()
+
+    def update_indices(self, edited_activities: Optional[Iterable[Activity]] = None):
+        # Indices of update_scheduling_problem_do, without building the DO model.
+        # UP only appends activities and constraints to a problem, anything else
+        # (e.g. lists edited by hand) is converted again from scratch.
+        if len(self.mode_details) == 0:
+            self.build_indices()
+            return
+        activities = self.problem.activities
+        nb_known = len(self.activity_signatures)
+        last_known = self.activity_signatures[next(reversed(self.activity_signatures))]
+        if (
+            edited_activities is not None
+            and len(activities) >= nb_known
+            and activities[nb_known - 1] is last_known[0]
+        ):
+            # Activities appended since, and those edited in place.
+            candidates = itertools.chain(activities[nb_known:], edited_activities)
+            reindex = len(activities) > nb_known
+        else:
+            current = {a.name for a in activities}
+            removed = [t for t in self.activity_signatures if t not in current]
+            for name_activity in removed:
+                self._remove_activity(name_activity)
+            candidates = activities
+            reindex = len(removed) > 0
+        edited = []
+        for activity in candidates:
+            signature = self.activity_signatures.get(activity.name)
+            if signature is None or signature[0] is not activity:
+                # New, or replacing an activity of the same name.
+                if signature is not None:
+                    self._remove_activity(activity.name)
+                self._add_activity(activity)
+                reindex = True
+            elif (
+                activity.duration is not signature[1]
+                or len(activity.constraints) != signature[3]
+                or sum(len(e) for e in activity.effects.values()) != signature[2]
+            ):
+                if not self._update_activity(activity):
+                    self.build_indices()
+                    return
+                edited.append(activity)
+        base_constraints = self.problem.base_constraints
+        nb_base = len(self.base_constraints)
+        if nb_base > 0 and (
+            len(base_constraints) < nb_base
+            or base_constraints[nb_base - 1] is not self.base_constraints[-1]
+        ):
+            self.build_indices()
+            return
+        for fnode in base_constraints[nb_base:]:
+            if fnode not in self.constraint_records:
+                self._add_constraint(fnode)
+        self.base_constraints = base_constraints
+        self._update_calendars()
+        if reindex:
+            self.activity_list = activities
+            self.activity_map = {a.name: a for a in activities}
+            self._index_activities()
+        else:
+            for activity in edited:
+                i = self.timepoint_index[activity.start]
+                self.plan_durations[i] = self._duration(activity.name)
+
+    def build_do_solution(
+        self,
+        prior: Union[Schedule, Dict[Any, Any], RCPSPSolution],
+        scheduling_problem: RCPSPModel,
+    ) -> RCPSPSolution:
+        """Maps a previous schedule onto the DO problem, as a task permutation.
+
+        prior is either a plan, as built by build_up_plan, an assignment of
+        activity timepoints, or a DO solution of a previous version of the problem.
+        """
+        if isinstance(prior, RCPSPSolution):
+            start_times = {
+                task: prior.get_start_time(task) for task in prior.rcpsp_schedule
+            }
+        else:
+            start_times = self.plan_start_times(prior)
+        # Tasks unknown from the previous schedule (e.g. new activities) go last,
+        # the serial SGS then repairs the schedule in this order.
+        tasks = scheduling_problem.tasks_list_non_dummy
+        permutation = sorted(
+            range(len(tasks)),
+            key=lambda i: (start_times.get(tasks[i], float("inf")), i),
+        )
+        return RCPSPSolution(
+            problem=scheduling_problem,
+            rcpsp_permutation=permutation,
+            rcpsp_modes=[1 for _ in tasks],
+        )
+
+    def plan_start_times(self, plan: Union[Schedule, Dict[Any, Any]]) -> Dict[str, int]:
+        # Start time of the activities of the plan, by name.
+        if isinstance(plan, Schedule):
+            plan = plan.assignment
+        start_times = {}
+        for timepoint, value in plan.items():
+            activity = self.start_var_to_activity.get(timepoint)
+            if activity is None:
+                continue
+            if isinstance(value, FNode):
+                value = value.constant_value()
+            start_times[activity.name] = int(value)
+        return start_times
+
+    def downstream_tasks(self, tasks: List[str]) -> List[str]:
+        """The tasks and those reachable from them through precedences and
+        generalized precedences, whose start may depend on theirs."""
+        related: Dict[str, List[str]] = {}
+        for relation, pairs in self.special_relations.items():
+            for key in pairs:
+                related.setdefault(key[0], []).append(key[1])
+                if relation in ["start_together", "start_at_end"]:
+                    related.setdefault(key[1], []).append(key[0])
+        reached = set(tasks)
+        stack = list(tasks)
+        while stack:
+            task = stack.pop()
+            for successor in itertools.chain(
+                self.successors[task], related.get(task, [])
+            ):
+                if successor not in reached:
+                    reached.add(successor)
+                    stack.append(successor)
+        return [t for t in self.mode_details if t in reached]
+
+    def build_repair_problem(
+        self,
+        start_times: Dict[str, int],
+        free_tasks: List[str],
+        earliest_start: int = 0,
+    ) -> Optional[RCPSPModel]:
+        """Reduced DO model scheduling free_tasks from earliest_start on, every
+        other activity being fixed at its start time, in the time unit of the
+        problem.
+
+        The resources used by the fixed activities are removed from the calendars,
+        and their constraints with the free activities become release dates and
+        deadlines. Returns None if the fixed activities not started at
+        earliest_start exceed the capacity of a resource, those started before
+        are kept whatever the capacity.
+        """
+        free_set = set(free_tasks)
+        repair = copy.copy(self)
+        repair.scale_time = False
+        repair.mode_details = {t: self.mode_details[t] for t in free_tasks}
+        repair.successors = {
+            t: [s for s in self.successors[t] if s in free_set] for t in free_tasks
+        }
+        release_dates = {
+            t: max(earliest_start, self.release_dates.get(t, earliest_start))
+            for t in free_tasks
+        }
+        deadlines = {t: self.deadlines[t] for t in free_tasks if t in self.deadlines}
+
+        def start(task: str) -> int:
+            return start_times[task]
+
+        def end(task: str) -> int:
+            return start_times[task] + self._duration(task)
+
+        def release(task: str, date: int):
+            release_dates[task] = max(release_dates[task], date)
+
+        # Deadlines bound the end of the activities.
+        def deadline(task: str, date: int):
+            deadlines[task] = min(deadlines.get(task, date), date)
+
+        for task, successors in self.successors.items():
+            for successor in successors:
+                if task in free_set and successor not in free_set:
+                    deadline(task, start(successor))
+                elif task not in free_set and successor in free_set:
+                    release(successor, end(task))
+        repair.special_relations = {
+            relation: Counter() for relation in SPECIAL_RELATIONS
+        }
+        for relation, pairs in self.special_relations.items():
+            for key, n in pairs.items():
+                task0, task1 = key[0], key[1]
+                if task0 in free_set and task1 in free_set:
+                    repair.special_relations[relation][key] = n
+                elif task1 in free_set:
+                    if relation == "start_together":
+                        release(task1, start(task0))
+                        deadline(task1, start(task0) + self._duration(task1))
+                    elif relation == "start_at_end":
+                        release(task1, end(task0))
+                        deadline(task1, end(task0) + self._duration(task1))
+                    elif relation == "start_at_end_plus_offset":
+                        release(task1, end(task0) + key[2])
+                    else:
+                        release(task1, start(task0) + key[2])
+                elif task0 in free_set:
+                    if relation == "start_together":
+                        release(task0, start(task1))
+                        deadline(task0, start(task1) + self._duration(task0))
+                    elif relation == "start_at_end":
+                        release(task0, start(task1) - self._duration(task0))
+                        deadline(task0, start(task1))
+                    elif relation == "start_at_end_plus_offset":
+                        deadline(task0, start(task1) - key[2])
+                    else:
+                        deadline(task0, start(task1) - key[2] + self._duration(task0))
+        repair.release_dates = release_dates
+        repair.deadlines = deadlines
+        # Usage of the fixed activities still running at earliest_start, the
+        # started ones first.
+        resources = {
+            resource
+            for t in free_tasks
+            for details in self.mode_details[t].values()
+            for resource, quantity in details.items()
+            if resource != "duration" and quantity > 0
+        }
+        usage = {started: {r: ([], []) for r in resources} for started in [True, False]}
+        for task, modes in self.mode_details.items():
+            if task in free_set or end(task) <= earliest_start:
+                continue
+            for resource, quantity in modes[1].items():
+                if resource in resources and quantity > 0:
+                    times, deltas = usage[start(task) < earliest_start][resource]
+                    times.extend([start(task), end(task)])
+                    deltas.extend([-quantity, quantity])
+        repair.calendars = {}
+        for resource in resources:
+            calendar = self.calendars[resource].with_events(*usage[True][resource])
+            if min([calendar.capacity] + calendar.values) < 0:
+                logger.warning(
+                    f"Activities started before {earliest_start} exceed "
+                    f"the capacity of {resource}"
+                )
+                calendar.capacity = max(calendar.capacity, 0)
+                calendar.values = [max(value, 0) for value in calendar.values]
+            calendar = calendar.with_events(*usage[False][resource])
+            if min([calendar.capacity] + calendar.values) < 0:
+                return None
+            repair.calendars[resource] = calendar
+        return repair._emit_model(time_scale=1)
+
+    def repaired_schedule_times(
+        self, start_times: Dict[str, int], solution: Optional[RCPSPSolution]
+    ) -> np.ndarray:
+        """Times as in schedule_times, from the solution of a repair problem for
+        the tasks it schedules and from start_times for the others."""
+        schedule = {} if solution is None else solution.rcpsp_schedule
+        starts = np.fromiter(
+            (
+                schedule[t]["start_time"] if t in schedule else start_times[t]
+                for t in self.mode_details
+            ),
+            dtype=np.int64,
+            count=len(self.mode_details),
         )
+        return np.concatenate([starts, starts + self.plan_durations])
 
-    def build_up_plan(self, solution: RCPSPSolution) -> Dict[Any, int]:
-        # TODO : recode this.
-        assignment_dict = {}
-        activities_list = []
-        for activity_name in solution.rcpsp_schedule:
-            if activity_name in self.activity_map:
-                act = self.activity_map[activity_name]
-                assignment_dict[act.start] = solution.get_start_time(activity_name)
-                assignment_dict[act.end] = solution.get_end_time(activity_name)
-                activities_list.append(act)
-        # up_plan = Schedule(assignment=assignment_dict, activities=activities_list)
-        return assignment_dict
+    def _index_activities(self):
+        self.plan_activities = [self.task_activities[t] for t in self.mode_details]
+        self.plan_durations = np.array(
+            [self._duration(t) for t in self.mode_details], dtype=np.int64
+        )
+        self.timepoint_index = index_timepoints(self.plan_activities)
+
+    def schedule_times(self, solution: RCPSPSolution) -> np.ndarray:
+        """Start times of the activities followed by their end times, in the time
+        unit of the problem and the order of plan_activities."""
+        schedule = solution.rcpsp_schedule
+        starts = np.fromiter(
+            (schedule[t]["start_time"] for t in self.mode_details),
+            dtype=np.int64,
+            count=len(self.mode_details),
+        )
+        # Back to the time unit of the problem, with the exact durations in case
+        # they were rounded up.
+        starts *= self.time_scale
+        return np.concatenate([starts, starts + self.plan_durations])
+
+    def build_up_plan(self, solution: RCPSPSolution) -> Schedule:
+        return build_schedule(
+            self.plan_activities,
+            self.timepoint_index,
+            self.schedule_times(solution),
+            self.problem.environment,
+        )
+
+    def build_lazy_up_plan(self, solution: RCPSPSolution) -> LazySchedule:
+        # Only the times are computed, expressions are built on access.
+        return build_schedule(
+            self.plan_activities,
+            self.timepoint_index,
+            self.schedule_times(solution),
+            self.problem.environment,
+            lazy=True,
+        )
@@ -0,0 +1,163 @@
+import copy
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Optional, Type
+
+from discrete_optimization.generic_tools.do_solver import SolverDO
+from discrete_optimization.generic_tools.result_storage.result_storage import (
+    ResultStorage,
+)
+from discrete_optimization.rcpsp.rcpsp_model import RCPSPModel, RCPSPSolution
+
+from up_discreteoptimization.convert_problem import (
+    SPECIAL_RELATIONS,
+    ConvertToDiscreteOptim,
+)
+from up_discreteoptimization.portfolio import solve_components
+
+logger = logging.getLogger(__name__)
+
+
+def connected_components(converter: ConvertToDiscreteOptim) -> List[List[str]]:
+    """Groups of activities linked, directly or not, by a precedence, a generalized
+    precedence or a resource they both use. Activities keep the order of the
+    converted problem, and components are sorted by their first activity."""
+    parent: Dict[str, str] = {task: task for task in converter.mode_details}
+
+    def find(node: str) -> str:
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def union(node1: str, node2: str):
+        root1, root2 = find(node1), find(node2)
+        if root1 != root2:
+            parent[root2] = root1
+
+    # Resources are nodes of the union-find as well, prefixed so that they
+    # do not clash with activity names.
+    for task, modes in converter.mode_details.items():
+        for details in modes.values():
+            for resource, quantity in details.items():
+                if resource != "duration" and quantity > 0:
+                    resource_node = f"resource:{resource}"
+                    parent.setdefault(resource_node, resource_node)
+                    union(resource_node, task)
+    for task, successors in converter.successors.items():
+        for successor in successors:
+            union(task, successor)
+    for relation in SPECIAL_RELATIONS:
+        for key in converter.special_relations[relation]:
+            union(key[0], key[1])
+    components: Dict[str, List[str]] = {}
+    for task in converter.mode_details:
+        components.setdefault(find(task), []).append(task)
+    return list(components.values())
+
+
+def build_component_problem(
+    converter: ConvertToDiscreteOptim, tasks: List[str]
+) -> RCPSPModel:
+    """DO model of the activities of one component, with the resources they use
+    and the constraints between them."""
+    # Built from the indices in the time unit of the DO model of the whole problem.
+    converter = converter.scaled
+    tasks_set = set(tasks)
+    component = copy.copy(converter)
+    component.mode_details = {t: converter.mode_details[t] for t in tasks}
+    component.successors = {t: converter.successors[t] for t in tasks}
+    component.release_dates = {
+        t: v for t, v in converter.release_dates.items() if t in tasks_set
+    }
+    component.deadlines = {
+        t: v for t, v in converter.deadlines.items() if t in tasks_set
+    }
+    component.special_relations = {
+        relation: Counter({key: n for key, n in pairs.items() if key[0] in tasks_set})
+        for relation, pairs in converter.special_relations.items()
+    }
+    resources = {
+        resource
+        for t in tasks
+        for details in converter.mode_details[t].values()
+        for resource, quantity in details.items()
+        if resource != "duration" and quantity > 0
+    }
+    component.calendars = {
+        r: c for r, c in converter.calendars.items() if r in resources
+    }
+    return component._emit_model(time_scale=1)
+
+
+def merge_component_solutions(
+    problem: RCPSPModel, solutions: List[RCPSPSolution]
+) -> RCPSPSolution:
+    """Solution of the whole problem made of the schedules of its components."""
+    schedule = {problem.source_task: {"start_time": 0, "end_time": 0}}
+    for solution in solutions:
+        for task in solution.problem.tasks_list_non_dummy:
+            schedule[task] = {
+                "start_time": solution.get_start_time(task),
+                "end_time": solution.get_end_time(task),
+            }
+    end = max([0] + [s["end_time"] for s in schedule.values()])
+    schedule[problem.sink_task] = {"start_time": end, "end_time": end}
+    return RCPSPSolution(
+        problem=problem,
+        rcpsp_schedule=schedule,
+        rcpsp_modes=[1 for _ in problem.tasks_list_non_dummy],
+    )
+
+
+def solve_decomposed(
+    converter: ConvertToDiscreteOptim,
+    problem: RCPSPModel,
+    solver_class: Type[SolverDO],
+    params_solver: Dict[str, Any],
+    time_limit: Optional[float] = None,
+    max_workers: Optional[int] = None,
+) -> Optional[ResultStorage]:
+    """Solves the independent components of the problem concurrently, one DO model
+    each, and merges their schedules.
+
+    Returns None if the problem has a single component, and an empty result
+    storage if a component could not be solved.
+    """
+    components = connected_components(converter)
+    if len(components) <= 1:
+        return None
+    logger.info(
+        f"Problem decomposed in {len(components)} components, "
+        f"the largest has {max(len(tasks) for tasks in components)} activities"
+    )
+    component_problems = [
+        build_component_problem(converter, tasks) for tasks in components
+    ]
+    # A single activity is scheduled at its earliest start by the serial SGS,
+    # only the other components are given to the solver.
+    to_solve = [i for i, tasks in enumerate(components) if len(tasks) > 1]
+    solutions: List[Optional[RCPSPSolution]] = [
+        problem_component.get_dummy_solution()
+        for problem_component in component_problems
+    ]
+    solved = solve_components(
+        [component_problems[i] for i in to_solve],
+        solver_class,
+        params_solver,
+        time_limit=time_limit,
+        max_workers=max_workers,
+    )
+    for i, solution in zip(to_solve, solved):
+        if solution is not None:
+            solutions[i] = solution
+        elif not component_problems[i].satisfy(solutions[i]):
+            solutions[i] = None
+    if any(solution is None for solution in solutions):
+        logger.info("No schedule found for some components")
+        return ResultStorage(list_solution_fits=[])
+    solution = merge_component_solutions(problem, solutions)
+    # Fitness is maximized in the DO result storage.
+    return ResultStorage(
+        list_solution_fits=[(solution, -problem.evaluate(solution)["makespan"])]
+    )
@@ -1,10 +1,30 @@
+import itertools
 import logging
-from typing import IO, Callable, Optional, Type
+import queue
+import threading
+import time
+from contextlib import ExitStack, contextmanager, nullcontext
+from typing import (
+    IO,
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
 import unified_planning as up
 import unified_planning.engines
 import unified_planning.engines.mixins
 from discrete_optimization.generic_tools.do_solver import SolverDO
+from discrete_optimization.generic_tools.result_storage.result_storage import (
+    ResultStorage,
+)
 from discrete_optimization.rcpsp.rcpsp_model import RCPSPModel, RCPSPSolution
 from discrete_optimization.rcpsp.rcpsp_solvers import (
     look_for_solver_class,
@@ -12,24 +32,134 @@ from discrete_optimization.rcpsp.rcpsp_solvers import (
     solvers_map,
 )
 from unified_planning.engines import PlanGenerationResultStatus
+from unified_planning.engines.mixins.anytime_planner import AnytimeGuarantee
 from unified_planning.model import ProblemKind
+from unified_planning.model.scheduling import SchedulingProblem
+from unified_planning.plans import Schedule
 
-from up_discreteoptimization.convert_problem import ConvertToDiscreteOptim
+from up_discreteoptimization.async_solve import solve_in_process
+from up_discreteoptimization.bounds import makespan_lower_bound
+from up_discreteoptimization.cache import ConversionCache, problem_fingerprint
+from up_discreteoptimization.convert_problem import (
+    ConvertToDiscreteOptim,
+    build_schedule,
+    set_solver_special_constraints,
+)
+from up_discreteoptimization.decomposition import solve_decomposed
+from up_discreteoptimization.instrumentation import (
+    ConvergenceTrace,
+    MetricsCallback,
+    PhaseTimer,
+    SolutionHook,
+    SolveProfiler,
+    SolveStopped,
+    model_statistics,
+    trace_evaluations,
+)
+from up_discreteoptimization.jobshop import (
+    JobShopModel,
+    detect_job_shop,
+    solve_job_shop,
+)
+from up_discreteoptimization.portfolio import PortfolioEntry, solve_portfolio
+from up_discreteoptimization.solution_store import SolutionStore, solver_key
+from up_discreteoptimization.time_budget import TimeBudget, set_solver_time_limit
+from up_discreteoptimization.warm_start import solve_from_solution
 
 logger = logging.getLogger(__name__)
 
 
 class EngineDiscreteOptimization(
-    up.engines.Engine, up.engines.mixins.OneshotPlannerMixin
+    up.engines.Engine,
+    up.engines.mixins.OneshotPlannerMixin,
+    up.engines.mixins.AnytimePlannerMixin,
 ):
-    def __init__(self, solver_class: Optional[Type[SolverDO]] = None, **kwargs):
+    def __init__(
+        self,
+        solver_class: Optional[Type[SolverDO]] = None,
+        horizon: Optional[int] = None,
+        reduce_precedences: bool = False,
+        scale_time: bool = False,
+        time_resolution: Optional[int] = None,
+        detect_job_shop: bool = False,
+        decompose: bool = False,
+        use_conversion_cache: bool = False,
+        conversion_cache_size: int = 32,
+        portfolio: Optional[List[PortfolioEntry]] = None,
+        max_workers: Optional[int] = None,
+        trace_memory: bool = False,
+        metrics_callback: Optional[MetricsCallback] = None,
+        solution_store: Optional[Union[str, SolutionStore]] = None,
+        lazy_plans: bool = False,
+        trace_convergence: bool = False,
+        profile_cpu: bool = False,
+        profile_memory: bool = False,
+        **kwargs,
+    ):
         up.engines.Engine.__init__(self)
         up.engines.mixins.OneshotPlannerMixin.__init__(self)
+        up.engines.mixins.AnytimePlannerMixin.__init__(self)
         self.converter: Optional[ConvertToDiscreteOptim] = None
+        # True while the converter is an entry of the conversion cache.
+        self.converter_cached = False
         self.solver_class = solver_class
+        # If given, list of (solver_class, params) run concurrently instead of solver_class.
+        self.portfolio = portfolio
+        self.max_workers = max_workers
+        self.horizon = horizon
+        self.reduce_precedences = reduce_precedences
+        # Times are divided by their common divisor in the DO model, and rounded
+        # to multiples of time_resolution if given (see ConvertToDiscreteOptim).
+        self.scale_time = scale_time
+        self.time_resolution = time_resolution
+        # If True, pure job shops are solved with a disjunctive CP-SAT model
+        # instead of solver_class.
+        self.detect_job_shop = detect_job_shop
+        # If True, independent groups of activities (no shared resource nor
+        # precedence) are solved concurrently, as separate DO models.
+        self.decompose = decompose
+        self.conversion_cache: Optional[ConversionCache] = (
+            ConversionCache(max_size=conversion_cache_size)
+            if use_conversion_cache
+            else None
+        )
+        # Per-phase timings and model sizes are added to the result metrics,
+        # and passed to metrics_callback if given (e.g. to export them).
+        self.trace_memory = trace_memory
+        self.metrics_callback = metrics_callback
+        self.timer = PhaseTimer(trace_memory=trace_memory)
         self.params_solver = kwargs
         self.do_problem: Optional[RCPSPModel] = None
         self.do_solution: Optional[RCPSPSolution] = None
+        # Previous schedule (UP plan or assignment, or DO solution) the next solve starts from.
+        self.warm_start: Optional[Union[Schedule, Dict[Any, Any], RCPSPSolution]] = None
+        # Makespan lower bound of the last problem solved, solvers are stopped
+        # when a schedule reaches it.
+        self.lower_bound: Optional[int] = None
+        self.job_shop: Optional[JobShopModel] = None
+        # Best schedules known across runs, given as a SolutionStore or the path
+        # of its file. A schedule stored for the same problem and solver
+        # configuration is returned at once, one found by another configuration
+        # is a warm start.
+        self.solution_store: Optional[SolutionStore] = (
+            SolutionStore(solution_store)
+            if isinstance(solution_store, str)
+            else solution_store
+        )
+        self.store_keys: Optional[Tuple[str, str]] = None
+        self.store_hit = False
+        # If True, the times of the returned schedules are only turned into
+        # UP expressions when they are read.
+        self.lazy_plans = lazy_plans
+        # If True, the improving schedules of each solve (solve or get_solutions)
+        # are recorded in convergence_trace, with the time they were found and
+        # the solver that found them.
+        self.trace_convergence = trace_convergence
+        self.convergence_trace: Optional[ConvergenceTrace] = None
+        # cProfile and tracemalloc captures of the last solve, in profiler.
+        self.profile_cpu = profile_cpu
+        self.profile_memory = profile_memory
+        self.profiler: Optional[SolveProfiler] = None
 
     @property
     def name(self) -> str:
@@ -45,6 +175,491 @@ class EngineDiscreteOptimization(
     def supports(problem_kind: "up.model.ProblemKind") -> bool:
         return problem_kind <= EngineDiscreteOptimization.supported_kind()
 
+    @staticmethod
+    def ensures(anytime_guarantee: AnytimeGuarantee) -> bool:
+        return anytime_guarantee == AnytimeGuarantee.INCREASING_QUALITY
+
+    def repair(
+        self,
+        problem: SchedulingProblem,
+        schedule: Union[Schedule, Dict[Any, Any]],
+        disruption_time: int,
+        window: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> "up.engines.results.PlanGenerationResult":
+        """Repairs a schedule of the problem after a disruption at disruption_time
+        (e.g. a calendar effect added), only re-optimizing the affected activities.
+
+        Activities started before disruption_time are kept, as well as those
+        starting after disruption_time + window unless they depend on the others
+        (precedences). The others, and the activities missing from the schedule,
+        are rescheduled from disruption_time on, as a reduced DO model
+        (do_problem). If no schedule is found so, the window is
+        doubled until every activity not started is rescheduled, which window
+        None does at once.
+        """
+        budget = TimeBudget(timeout)
+        self.timer = PhaseTimer(trace_memory=self.trace_memory)
+        # Repairs are not traced, the reduced model has its own time unit.
+        self.convergence_trace = None
+        with self.timer.phase("convert"):
+            if self.converter is None or self.converter.problem is not problem:
+                self.converter = self._new_converter(problem)
+                self.converter_cached = False
+                self.converter.build_indices()
+            else:
+                # Only the edits of the problem since its last conversion.
+                self._own_converter()
+                self.converter.update_indices()
+            start_times = self.converter.plan_start_times(schedule)
+        unstarted = [
+            t
+            for t in self.converter.mode_details
+            if start_times.get(t, disruption_time) >= disruption_time
+        ]
+        # Activities of the window are rescheduled with those depending on them,
+        # so that the previous order stays feasible. The window is doubled until
+        # a schedule is found. Nothing is left to schedule if every activity has
+        # started.
+        unstarted_set = set(unstarted)
+        attempts: List[List[str]] = []
+        while window is not None and window > 0:
+            in_window = [
+                t
+                for t in unstarted
+                if start_times.get(t, disruption_time) < disruption_time + window
+            ]
+            affected = [
+                t
+                for t in self.converter.downstream_tasks(in_window)
+                if t in unstarted_set
+            ]
+            if len(affected) == len(unstarted):
+                break
+            if len(attempts) == 0 or len(affected) > len(attempts[-1]):
+                attempts.append(affected)
+            window *= 2
+        if len(unstarted) > 0:
+            attempts.append(unstarted)
+        problem_do, solution = None, None
+        for free_tasks in attempts:
+            with self.timer.phase("convert"):
+                problem_do = self.converter.build_repair_problem(
+                    start_times, free_tasks, earliest_start=disruption_time
+                )
+            if problem_do is None:
+                logger.info(
+                    "Activities after the window exceed the resource capacities"
+                )
+                continue
+            logger.info(
+                f"Rescheduling {len(free_tasks)} activities "
+                f"out of {len(self.converter.mode_details)}"
+            )
+            with self.timer.phase("bound"):
+                self.job_shop = None
+                self.lower_bound = makespan_lower_bound(problem_do)
+            with self.timer.phase("solve"):
+                # The previous order of the activities is kept if the solver
+                # does not beat it.
+                warm_solution = self.converter.build_do_solution(schedule, problem_do)
+                solution = warm_solution if problem_do.satisfy(warm_solution) else None
+                if (
+                    solution is None
+                    or problem_do.evaluate(solution)["makespan"] > self.lower_bound
+                ):
+                    # The decomposition reads the indices of the whole problem.
+                    with budget.solving() as time_limit:
+                        solved = self._solve_do(
+                            problem_do,
+                            time_limit,
+                            warm_solution,
+                            allow_decomposition=False,
+                        ).get_best_solution()
+                    if (
+                        solved is not None
+                        and problem_do.satisfy(solved)
+                        and (
+                            solution is None
+                            or problem_do.evaluate(solved)["makespan"]
+                            <= problem_do.evaluate(solution)["makespan"]
+                        )
+                    ):
+                        solution = solved
+            if solution is not None:
+                break
+        self.do_problem = problem_do
+        self.do_solution = solution
+        up_plan, makespan = None, None
+        if solution is not None or len(unstarted) == 0:
+            with self.timer.phase("back_convert"):
+                times = self.converter.repaired_schedule_times(start_times, solution)
+                up_plan = build_schedule(
+                    self.converter.plan_activities,
+                    self.converter.timepoint_index,
+                    times,
+                    problem.environment,
+                    lazy=self.lazy_plans,
+                )
+                makespan = int(times.max()) if len(times) > 0 else 0
+        if budget.expired():
+            status = PlanGenerationResultStatus.TIMEOUT
+        elif up_plan is None:
+            status = PlanGenerationResultStatus.UNSOLVABLE_INCOMPLETELY
+        else:
+            status = PlanGenerationResultStatus.SOLVED_SATISFICING
+        metrics = self.timer.metrics()
+        if makespan is not None:
+            metrics["objective"] = str(makespan)
+        if problem_do is not None:
+            metrics.update(model_statistics(problem_do))
+            self._report_metrics(metrics)
+        return up.engines.PlanGenerationResult(
+            status, up_plan, self.name, metrics=metrics
+        )
+
+    async def solve_async(
+        self, problem: SchedulingProblem, timeout: Optional[float] = None
+    ) -> "up.engines.results.PlanGenerationResult":
+        """Same as solve, run in a child process so that the event loop is not
+        blocked. Cancelling the awaiting task stops the child process and the
+        processes it started (portfolio workers, minizinc).
+
+        The child process works on a copy of this engine, whose state (converter,
+        do_solution, conversion cache) is not updated.
+        """
+        results = solve_in_process(self, problem, timeout)
+        try:
+            async for result in results:
+                return result
+        finally:
+            await results.aclose()
+
+    def get_solutions_async(
+        self, problem: SchedulingProblem, timeout: Optional[float] = None
+    ) -> AsyncIterator["up.engines.results.PlanGenerationResult"]:
+        """Same as get_solutions, run in a child process as in solve_async. The
+        child process is stopped when the iterator is closed, e.g. with
+        contextlib.aclosing when leaving the loop early."""
+        return solve_in_process(self, problem, timeout, anytime=True)
+
+    def _get_solutions(
+        self,
+        problem: "up.model.AbstractProblem",
+        timeout: Optional[float] = None,
+        output_stream: Optional[IO[str]] = None,
+        warm_start: Optional[Union[Schedule, Dict[Any, Any], RCPSPSolution]] = None,
+    ) -> Iterator["up.engines.results.PlanGenerationResult"]:
+        assert isinstance(problem, up.model.scheduling.SchedulingProblem)
+        with self._instrument(problem):
+            yield from self._iter_plans(problem, timeout, warm_start)
+
+    def _iter_plans(
+        self,
+        problem: SchedulingProblem,
+        timeout: Optional[float] = None,
+        warm_start: Optional[Union[Schedule, Dict[Any, Any], RCPSPSolution]] = None,
+    ) -> Iterator["up.engines.results.PlanGenerationResult"]:
+        budget = TimeBudget(timeout)
+        self.timer = PhaseTimer(trace_memory=self.trace_memory)
+        with self.timer.phase("convert"):
+            self.store_keys = self._store_keys(problem)
+            do_problem: RCPSPModel = self._convert_input_problem(problem)
+            self.do_problem = do_problem
+            warm_solution = self._build_warm_solution(do_problem, warm_start)
+        with self.timer.phase("bound"):
+            self._compute_lower_bound(do_problem)
+        statistics = self._model_statistics(do_problem)
+        # The serial SGS on the default permutation (or on the previous schedule)
+        # gives a first schedule at once. The solver meanwhile runs in a worker
+        # thread, its schedules being streamed as they are found.
+        with self.timer.phase("solve"):
+            # The SGS compiles on its first call, which is timed with the solve.
+            # The job shop model does not use it, it is not compiled for it then.
+            first_solutions = []
+            if warm_solution is not None:
+                first_solutions.append((warm_solution, "warm_start"))
+            if self.job_shop is None:
+                first_solutions.append((do_problem.get_dummy_solution(), "SGS"))
+            first_solutions = [
+                (solution, solver_name, time.perf_counter())
+                for solution, solver_name in first_solutions
+                if do_problem.satisfy(solution)
+            ]
+        best_makespan = None
+        with ExitStack() as stack:
+            candidates = iter(first_solutions)
+            if not self.store_hit and not any(
+                do_problem.evaluate(solution)["makespan"] <= self.lower_bound
+                for solution, _, _ in first_solutions
+            ):
+                candidates = itertools.chain(
+                    candidates,
+                    stack.enter_context(
+                        self._stream_solutions_do(
+                            do_problem, budget.solving_time(), warm_solution
+                        )
+                    ),
+                )
+            while True:
+                with self.timer.phase("solve"):
+                    candidate = next(candidates, None)
+                    if candidate is None:
+                        break
+                    solution, solver_name, found_time = candidate
+                    if not do_problem.satisfy(solution):
+                        continue
+                    makespan = do_problem.evaluate(solution)["makespan"]
+                    if best_makespan is not None and makespan >= best_makespan:
+                        continue
+                best_makespan = makespan
+                self._record_schedule(makespan, solver_name, found_time)
+                self.do_solution = solution
+                with self.timer.phase("back_convert"):
+                    up_plan = self._convert_output_problem(solution)
+                self._store_solution(solution)
+                metrics = {
+                    "objective": str(self._plan_makespan(solution)),
+                    # When the schedule was found, not when it is handed over.
+                    "timestamp": str(time.time() - (time.perf_counter() - found_time)),
+                    "elapsed_time": str(found_time - budget.start_time),
+                    **statistics,
+                    **self._bound_metrics(makespan),
+                    **self.timer.metrics(),
+                }
+                self._report_metrics(metrics)
+                with self._pause_profile():
+                    yield up.engines.PlanGenerationResult(
+                        PlanGenerationResultStatus.INTERMEDIATE,
+                        up_plan,
+                        self.name,
+                        metrics=metrics,
+                    )
+                if makespan <= self.lower_bound:
+                    # Optimal, the solver is stopped, or not even started if the
+                    # first schedules reach the bound.
+                    logger.info(f"Optimal schedule found, makespan {makespan}")
+                    break
+
+    @contextmanager
+    def _stream_solutions_do(
+        self,
+        problem: RCPSPModel,
+        time_limit: Optional[float] = None,
+        warm_solution: Optional[RCPSPSolution] = None,
+    ) -> Iterator[Iterator[Tuple[RCPSPSolution, str, float]]]:
+        """Runs the solver in a worker thread, giving the improving schedules
+        with the solver name and the time.perf_counter() value when each was
+        found, as they are found.
+
+        Schedules are taken from the evaluations of the solver, the CP-SAT
+        callback of the job shop model or the portfolio workers, and otherwise
+        from the solver results once it returns. The solver is stopped on exit,
+        at its next schedule, and waited for.
+        """
+        found: "queue.Queue[Any]" = queue.Queue()
+        stop = threading.Event()
+        best_makespan = None
+
+        def on_solution(
+            solution: RCPSPSolution,
+            makespan: float,
+            solver_name: str,
+            found_time: float,
+        ) -> bool:
+            nonlocal best_makespan
+            if best_makespan is None or makespan < best_makespan:
+                best_makespan = makespan
+                # Solvers may modify their solutions afterwards.
+                found.put((solution.copy(), solver_name, found_time))
+            return stop.is_set()
+
+        def run():
+            try:
+                with nullcontext() if self.profiler is None else (
+                    self.profiler.thread()
+                ):
+                    result_storage = self._solve_do(
+                        problem, time_limit, warm_solution, on_solution=on_solution
+                    )
+                for solution, _ in result_storage.list_solution_fits:
+                    found.put((solution, self._solver_name(), time.perf_counter()))
+            except SolveStopped:
+                pass
+            except BaseException as e:
+                found.put(e)
+            finally:
+                found.put(None)
+
+        def solutions() -> Iterator[Tuple[RCPSPSolution, str, float]]:
+            while True:
+                item = found.get()
+                if item is None:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+
+        worker = threading.Thread(target=run, name="solver", daemon=True)
+        worker.start()
+        try:
+            yield solutions()
+        finally:
+            stop.set()
+            worker.join()
+
+    def _build_warm_solution(
+        self,
+        problem: RCPSPModel,
+        warm_start: Optional[Union[Schedule, Dict[Any, Any], RCPSPSolution]] = None,
+    ) -> Optional[RCPSPSolution]:
+        if warm_start is None:
+            warm_start = self.warm_start
+        self.store_hit = False
+        if warm_start is None and self.store_keys is not None:
+            problem_key, configuration_key = self.store_keys
+            stored = self.solution_store.get(problem_key, configuration_key)
+            self.store_hit = stored is not None
+            if stored is None:
+                stored = self.solution_store.get_best(problem_key)
+            if stored is not None:
+                logger.info(
+                    f"Schedule of makespan {stored[0]} found in the solution store"
+                    + (" for this configuration" if self.store_hit else "")
+                )
+                activity_map = self.converter.activity_map
+                warm_start = {
+                    activity_map[name].start: start
+                    for name, start in stored[1].items()
+                    if name in activity_map
+                }
+        if warm_start is None:
+            return None
+        return self.converter.build_do_solution(warm_start, problem)
+
+    def _store_keys(self, problem: SchedulingProblem) -> Optional[Tuple[str, str]]:
+        # Problem hash, and description of everything else the schedule depends on.
+        if self.solution_store is None:
+            return None
+        if self.portfolio is not None:
+            name = "portfolio"
+            params = {
+                f"{i}_{solver_class.__name__}": params_solver
+                for i, (solver_class, params_solver) in enumerate(self.portfolio)
+            }
+        else:
+            name = "SGS" if self.solver_class is None else self.solver_class.__name__
+            params = dict(self.params_solver)
+        params.update(
+            detect_job_shop=self.detect_job_shop,
+            decompose=self.decompose,
+            horizon=self.horizon,
+            scale_time=self.scale_time,
+            time_resolution=self.time_resolution,
+            reduce_precedences=self.reduce_precedences,
+        )
+        return problem_fingerprint(problem), solver_key(name, params)
+
+    def _plan_makespan(self, solution: RCPSPSolution) -> int:
+        # In the time unit of the problem, from the back-converted times, the
+        # scaled makespan overstates it when durations were rounded up.
+        times = self.converter.schedule_times(solution)
+        return int(times.max()) if len(times) > 0 else 0
+
+    def _store_solution(self, solution: RCPSPSolution):
+        if self.store_keys is None:
+            return
+        times = self.converter.schedule_times(solution)
+        activities = self.converter.plan_activities
+        start_times = dict(
+            zip([a.name for a in activities], times[: len(activities)].tolist())
+        )
+        makespan = int(times.max()) if len(times) > 0 else 0
+        self.solution_store.put(*self.store_keys, makespan, start_times)
+
+    def _solve_do(
+        self,
+        problem: RCPSPModel,
+        time_limit: Optional[float] = None,
+        warm_solution: Optional[RCPSPSolution] = None,
+        allow_decomposition: bool = True,
+        on_solution: Optional[SolutionHook] = None,
+    ) -> ResultStorage:
+        # Schedules found by the solver are passed to on_solution as they are
+        # found, or recorded in the convergence trace, not only once it returns.
+        if on_solution is None and self.convergence_trace is not None:
+            on_solution = self._trace_solution
+        if self.portfolio is not None:
+            return solve_portfolio(
+                problem,
+                self.portfolio,
+                time_limit=time_limit,
+                max_workers=self.max_workers,
+                lower_bound=self.lower_bound,
+                on_schedule=None
+                if on_solution is None
+                else lambda solution, makespan, solver_name: on_solution(
+                    solution, makespan, solver_name, time.perf_counter()
+                ),
+            )
+        if self.job_shop is not None:
+            result_storage, self.lower_bound = solve_job_shop(
+                self.job_shop,
+                problem,
+                time_limit,
+                warm_solution,
+                lower_bound=self.lower_bound,
+                on_solution=None
+                if on_solution is None
+                else lambda solution, found_time: on_solution(
+                    solution,
+                    problem.evaluate(solution)["makespan"],
+                    "job_shop",
+                    found_time,
+                ),
+            )
+            return result_storage
+        if self.solver_class is None:
+            solution = (
+                problem.get_dummy_solution() if warm_solution is None else warm_solution
+            )
+            # Fitness is maximized in the DO result storage.
+            return ResultStorage(
+                list_solution_fits=[(solution, -problem.evaluate(solution)["makespan"])]
+            )
+        if self.decompose and allow_decomposition:
+            # The warm start, if any, is only used as a fallback in that case.
+            result_storage = solve_decomposed(
+                self.converter,
+                problem,
+                self.solver_class,
+                self.params_solver,
+                time_limit=time_limit,
+                max_workers=self.max_workers,
+            )
+            if result_storage is not None:
+                return result_storage
+        params_solver = set_solver_special_constraints(
+            self.solver_class, self.params_solver, problem
+        )
+        if time_limit is not None:
+            params_solver = set_solver_time_limit(
+                self.solver_class, params_solver, time_limit, problem
+            )
+        if on_solution is not None:
+            solver_name = self._solver_name()
+            problem = trace_evaluations(
+                problem,
+                lambda solution, makespan: on_solution(
+                    solution, makespan, solver_name, time.perf_counter()
+                ),
+            )
+        if warm_solution is not None:
+            return solve_from_solution(
+                self.solver_class, problem, params_solver, warm_solution
+            )
+        return solve(method=self.solver_class, rcpsp_model=problem, **params_solver)
+
     def _solve(
         self,
         problem: "up.model.AbstractProblem",
@@ -53,31 +668,237 @@ class EngineDiscreteOptimization(
         ] = None,
         timeout: Optional[float] = None,
         output_stream: Optional[IO[str]] = None,
+        warm_start: Optional[Union[Schedule, Dict[Any, Any], RCPSPSolution]] = None,
     ) -> "up.engines.results.PlanGenerationResult":
         assert isinstance(problem, up.model.scheduling.SchedulingProblem)
-        problem: RCPSPModel = self._convert_input_problem(problem)
-        self.do_problem = problem
-        if self.solver_class is None:
-            solution: RCPSPSolution = problem.get_dummy_solution()
-        else:
-            results = solve(
-                method=self.solver_class, rcpsp_model=problem, **self.params_solver
-            )
-            solution = results.get_best_solution()
+        with self._instrument(problem):
+            return self._solve_problem(problem, timeout, warm_start)
+
+    def _solve_problem(
+        self,
+        problem: SchedulingProblem,
+        timeout: Optional[float] = None,
+        warm_start: Optional[Union[Schedule, Dict[Any, Any], RCPSPSolution]] = None,
+    ) -> "up.engines.results.PlanGenerationResult":
+        budget = TimeBudget(timeout)
+        self.timer = PhaseTimer(trace_memory=self.trace_memory)
+        with self.timer.phase("convert"):
+            self.store_keys = self._store_keys(problem)
+            problem: RCPSPModel = self._convert_input_problem(problem)
+            self.do_problem = problem
+            warm_solution = self._build_warm_solution(problem, warm_start)
+        with self.timer.phase("bound"):
+            self._compute_lower_bound(problem)
+        with self.timer.phase("solve"):
+            # The repaired previous schedule, or the SGS schedule of the default
+            # permutation, is kept if the solver does not beat it. The solver is
+            # not even started if that schedule is already optimal. The job shop
+            # model does not use the SGS, which is not compiled for it then.
+            solution: Optional[RCPSPSolution] = warm_solution
+            if solution is None and self.job_shop is None:
+                solution = problem.get_dummy_solution()
+            if solution is not None and not problem.satisfy(solution):
+                solution = None
+            if solution is not None:
+                self._record_schedule(
+                    problem.evaluate(solution)["makespan"],
+                    "SGS" if warm_solution is None else "warm_start",
+                )
+            if solution is None or (
+                not self.store_hit
+                and problem.evaluate(solution)["makespan"] > self.lower_bound
+            ):
+                with budget.solving() as time_limit:
+                    solved = self._best_feasible_solution(
+                        problem, self._solve_do(problem, time_limit, warm_solution)
+                    )
+                if solved is not None and (
+                    solution is None
+                    or problem.evaluate(solved)["makespan"]
+                    <= problem.evaluate(solution)["makespan"]
+                ):
+                    solution = solved
+                    self._record_schedule(
+                        problem.evaluate(solved)["makespan"], self._solver_name()
+                    )
         self.do_solution = solution
-        up_plan = self._convert_output_problem(solution)
+        with self.timer.phase("back_convert"):
+            up_plan = (
+                None if solution is None else self._convert_output_problem(solution)
+            )
+        makespan = None if solution is None else problem.evaluate(solution)["makespan"]
+        if solution is not None:
+            self._store_solution(solution)
+        if (
+            makespan is not None
+            and makespan <= self.lower_bound
+            and self.converter.time_rounding_error == 0
+        ):
+            # Optimality is not proven if times were rounded.
+            status = PlanGenerationResultStatus.SOLVED_OPTIMALLY
+        elif budget.expired():
+            # Best incumbent found within the time budget, if any.
+            status = PlanGenerationResultStatus.TIMEOUT
+        elif up_plan is None:
+            # No feasible schedule found, which does not prove there is none.
+            status = PlanGenerationResultStatus.UNSOLVABLE_INCOMPLETELY
+        else:
+            status = PlanGenerationResultStatus.SOLVED_SATISFICING
+        metrics = {
+            **self._model_statistics(problem),
+            **self._bound_metrics(makespan),
+            **self.timer.metrics(),
+        }
+        if solution is not None:
+            metrics["objective"] = str(self._plan_makespan(solution))
+        self._report_metrics(metrics)
         return up.engines.PlanGenerationResult(
-            PlanGenerationResultStatus.UNSOLVABLE_PROVEN
-            if up_plan is None
-            else PlanGenerationResultStatus.SOLVED_SATISFICING,
-            up_plan,
-            self.name,
+            status, up_plan, self.name, metrics=metrics
+        )
+
+    @staticmethod
+    def _best_feasible_solution(
+        problem: RCPSPModel, result_storage: ResultStorage
+    ) -> Optional[RCPSPSolution]:
+        # Solvers may return schedules breaking the special constraints (the SGS
+        # does not enforce the offsets of generalized precedences), the best
+        # schedule satisfying every constraint is kept.
+        solutions = [solution for solution, _ in result_storage.list_solution_fits]
+        solutions.sort(key=lambda solution: problem.evaluate(solution)["makespan"])
+        for solution in solutions:
+            if problem.satisfy(solution):
+                return solution
+        return None
+
+    @contextmanager
+    def _instrument(self, problem: SchedulingProblem) -> Iterator[None]:
+        self.convergence_trace = (
+            ConvergenceTrace(problem.name) if self.trace_convergence else None
+        )
+        self.profiler = None
+        if self.profile_cpu or self.profile_memory:
+            self.profiler = SolveProfiler(
+                cpu=self.profile_cpu, memory=self.profile_memory
+            )
+            self.profiler.start()
+        try:
+            yield
+        finally:
+            if self.profiler is not None:
+                self.profiler.stop()
+
+    def _pause_profile(self):
+        # The time spent by the caller on each plan is not profiled.
+        return nullcontext() if self.profiler is None else self.profiler.pause()
+
+    def _trace_solution(
+        self,
+        solution: RCPSPSolution,
+        makespan: float,
+        solver_name: str,
+        found_time: float,
+    ) -> bool:
+        self._record_schedule(makespan, solver_name, found_time)
+        return False
+
+    def _solver_name(self) -> str:
+        if self.portfolio is not None:
+            return "portfolio"
+        if self.job_shop is not None:
+            return "job_shop"
+        return "SGS" if self.solver_class is None else self.solver_class.__name__
+
+    def _record_schedule(
+        self, makespan: float, solver_name: str, found_time: Optional[float] = None
+    ):
+        # Makespan in the time unit of the DO model.
+        if self.convergence_trace is not None:
+            self.convergence_trace.record(
+                makespan * self.converter.time_scale, solver_name, found_time
+            )
+
+    def _compute_lower_bound(self, problem: RCPSPModel):
+        self.job_shop = None
+        if self.detect_job_shop and self.portfolio is None:
+            self.job_shop = detect_job_shop(self.converter.scaled, problem.horizon)
+            if self.job_shop is not None:
+                logger.info(
+                    f"Job shop detected : {len(self.job_shop.jobs)} jobs, "
+                    f"{len(self.job_shop.unavailability)} machines"
+                )
+        self.lower_bound = makespan_lower_bound(problem, self.job_shop)
+
+    def _model_statistics(self, problem: RCPSPModel) -> Dict[str, str]:
+        return {
+            **model_statistics(problem),
+            "time_scale": str(self.converter.time_scale),
+            "time_rounding_error": str(self.converter.time_rounding_error),
+        }
+
+    def _bound_metrics(self, makespan: Optional[int]) -> Dict[str, str]:
+        # Expressed in the time unit of the problem, as the objective.
+        metrics = {"lower_bound": str(self.lower_bound * self.converter.time_scale)}
+        if makespan is not None and makespan > 0:
+            # Relative gap between the schedule and the lower bound.
+            metrics["gap"] = str(max(0, makespan - self.lower_bound) / makespan)
+        return metrics
+
+    def _report_metrics(self, metrics: Dict[str, str]):
+        logger.info(
+            f"Conversion {self.timer.timings.get('convert', 0.0):.3f}s, "
+            f"solve {self.timer.timings.get('solve', 0.0):.3f}s, "
+            f"back-conversion {self.timer.timings.get('back_convert', 0.0):.3f}s "
+            f"({metrics['nb_tasks']} tasks, {metrics['nb_edges']} edges, "
+            f"{metrics['nb_resources']} resources, horizon {metrics['horizon']})"
+        )
+        if self.metrics_callback is not None:
+            self.metrics_callback(metrics)
+
+    def _new_converter(self, problem: SchedulingProblem) -> ConvertToDiscreteOptim:
+        return ConvertToDiscreteOptim(
+            problem,
+            horizon=self.horizon,
+            reduce_precedences=self.reduce_precedences,
+            scale_time=self.scale_time,
+            time_resolution=self.time_resolution,
         )
 
     def _convert_input_problem(self, problem: "up.model.Problem") -> RCPSPModel:
-        self.converter = ConvertToDiscreteOptim(problem)
+        if self.converter is not None and self.converter.problem is problem:
+            # The problem converted last, possibly edited since, only the edits
+            # are converted.
+            self._own_converter()
+            return self.converter.update_scheduling_problem_do()
+        self.converter_cached = False
+        if self.conversion_cache is None:
+            self.converter = self._new_converter(problem)
+            return self.converter.build_scheduling_problem_do()
+        key = problem_fingerprint(
+            problem,
+            self.horizon,
+            self.reduce_precedences,
+            self.scale_time,
+            self.time_resolution,
+        )
+        cached = self.conversion_cache.get(key)
+        if cached is not None:
+            logger.debug(f"Conversion cache hit for problem {problem.name}")
+            converter, scheduling_problem = cached
+            self.converter = converter.rebind(problem)
+            return scheduling_problem
+        self.converter = self._new_converter(problem)
         scheduling_problem = self.converter.build_scheduling_problem_do()
+        self.conversion_cache.put(key, (self.converter, scheduling_problem))
+        self.converter_cached = True
         return scheduling_problem
 
-    def _convert_output_problem(self, solution: RCPSPSolution):
+    def _own_converter(self):
+        # Cached converters are kept intact, a copy is edited instead.
+        if self.converter_cached:
+            self.converter = self.converter.rebind(self.converter.problem)
+            self.converter_cached = False
+
+    def _convert_output_problem(self, solution: RCPSPSolution) -> Schedule:
+        if self.lazy_plans:
+            return self.converter.build_lazy_up_plan(solution)
         return self.converter.build_up_plan(solution)
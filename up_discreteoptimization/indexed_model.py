@@ -0,0 +1,125 @@
+import logging
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+from discrete_optimization.rcpsp.rcpsp_model import RCPSPModel
+from discrete_optimization.rcpsp.special_constraints import (
+    SpecialConstraintsDescription,
+)
+
+from up_discreteoptimization.convert_problem import (
+    SINK_TASK,
+    SOURCE_TASK,
+    build_special_constraints,
+    horizon_bound,
+)
+
+logger = logging.getLogger(__name__)
+
+# Deadline of the tasks without one.
+NO_DEADLINE = np.iinfo(np.int64).max
+
+
+class IndexedModel:
+    """Single mode scheduling model indexed by integers, task i being
+    task_names[i] : durations (n,), demands (n, r) of the resources
+    resource_names, successors in compressed sparse row form, those of task i
+    being successors_indices[successors_indptr[i]:successors_indptr[i+1]],
+    release dates (n,) and deadlines (n,), NO_DEADLINE if none.
+
+    It is the form the instance loaders read benchmark files into before
+    emitting the DO model, without going through a UP problem.
+    """
+
+    def __init__(
+        self,
+        task_names: List[str],
+        resource_names: List[str],
+        durations: np.ndarray,
+        demands: np.ndarray,
+        successors_indptr: np.ndarray,
+        successors_indices: np.ndarray,
+        release_dates: Optional[np.ndarray] = None,
+        deadlines: Optional[np.ndarray] = None,
+    ):
+        self.task_names = task_names
+        self.resource_names = resource_names
+        self.durations = np.asarray(durations, dtype=np.int64)
+        self.demands = np.asarray(demands, dtype=np.int64).reshape(
+            len(task_names), len(resource_names)
+        )
+        self.successors_indptr = np.asarray(successors_indptr, dtype=np.int64)
+        self.successors_indices = np.asarray(successors_indices, dtype=np.int64)
+        self.release_dates = (
+            np.zeros(len(task_names), dtype=np.int64)
+            if release_dates is None
+            else np.asarray(release_dates, dtype=np.int64)
+        )
+        self.deadlines = (
+            np.full(len(task_names), NO_DEADLINE, dtype=np.int64)
+            if deadlines is None
+            else np.asarray(deadlines, dtype=np.int64)
+        )
+
+    def compute_horizon(self) -> int:
+        return horizon_bound(
+            durations=self.durations.tolist(),
+            release_dates=self.release_dates.tolist(),
+            deadlines=self.deadlines[self.deadlines != NO_DEADLINE].tolist(),
+        )
+
+    def build_special_constraints(self) -> Optional[SpecialConstraintsDescription]:
+        names = self.task_names
+        return build_special_constraints(
+            release_dates={
+                names[i]: int(self.release_dates[i])
+                for i in np.flatnonzero(self.release_dates)
+            },
+            deadlines={
+                names[i]: int(self.deadlines[i])
+                for i in np.flatnonzero(self.deadlines != NO_DEADLINE)
+            },
+        )
+
+    def to_rcpsp_model(
+        self,
+        resources: Dict[str, Union[int, np.ndarray]],
+        horizon: Optional[int] = None,
+        source_task: str = SOURCE_TASK,
+        sink_task: str = SINK_TASK,
+    ) -> RCPSPModel:
+        """DO model with dummy source and sink tasks around the tasks, resources
+        giving the capacity (or availability array) of each resource."""
+        names = self.task_names
+        details = [{"duration": duration} for duration in self.durations.tolist()]
+        rows, columns = np.nonzero(self.demands)
+        for i, r, quantity in zip(
+            rows.tolist(), columns.tolist(), self.demands[rows, columns].tolist()
+        ):
+            details[i][self.resource_names[r]] = quantity
+        mode_details = {source_task: {1: {"duration": 0}}}
+        mode_details.update((name, {1: d}) for name, d in zip(names, details))
+        mode_details[sink_task] = {1: {"duration": 0}}
+        indptr = self.successors_indptr.tolist()
+        indices = self.successors_indices.tolist()
+        successors = {source_task: list(names)}
+        for i, name in enumerate(names):
+            successors[name] = [names[j] for j in indices[indptr[i] : indptr[i + 1]]]
+            successors[name].append(sink_task)
+        successors[sink_task] = []
+        special_constraints = self.build_special_constraints()
+        model = RCPSPModel(
+            resources=resources,
+            non_renewable_resources=[],
+            mode_details=mode_details,
+            successors=successors,
+            horizon=self.compute_horizon() if horizon is None else horizon,
+            tasks_list=[source_task] + list(names) + [sink_task],
+            source_task=source_task,
+            sink_task=sink_task,
+            special_constraints=special_constraints,
+        )
+        if special_constraints is not None:
+            # See ConvertToDiscreteOptim._emit_model.
+            model.update_functions()
+        return model
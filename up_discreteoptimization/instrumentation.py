@@ -0,0 +1,277 @@
+import copy
+import cProfile
+import csv
+import json
+import logging
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from discrete_optimization.rcpsp.rcpsp_model import RCPSPModel, RCPSPSolution
+
+logger = logging.getLogger(__name__)
+
+MetricsCallback = Callable[[Dict[str, str]], None]
+
+# Called with each schedule a solver finds, its makespan, the name of the solver
+# and the time.perf_counter() value when it was found. Returns True to stop the
+# solver.
+SolutionHook = Callable[[RCPSPSolution, float, str, float], bool]
+
+
+class SolveStopped(Exception):
+    """Raised from the evaluations of a solver to stop it."""
+
+
+class PhaseTimer:
+    """Wall time, and optionally peak memory, of the phases of a solve.
+
+    Times of a phase entered several times (e.g. the back-conversion of each
+    intermediate plan) are summed.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.timings: Dict[str, float] = {}
+        self.peak_memory: Dict[str, int] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        was_tracing = tracemalloc.is_tracing()
+        if self.trace_memory:
+            if was_tracing:
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = (
+                self.timings.get(name, 0.0) + time.perf_counter() - start
+            )
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                self.peak_memory[name] = max(self.peak_memory.get(name, 0), peak)
+                if not was_tracing:
+                    tracemalloc.stop()
+
+    def metrics(self) -> Dict[str, str]:
+        metrics = {f"{name}_time": str(value) for name, value in self.timings.items()}
+        for name, value in self.peak_memory.items():
+            metrics[f"{name}_peak_memory"] = str(value)
+        return metrics
+
+
+def model_statistics(problem: RCPSPModel) -> Dict[str, str]:
+    # Size of the DO model, dummy source and sink tasks included.
+    return {
+        "nb_tasks": str(problem.n_jobs),
+        "nb_edges": str(sum(len(problem.successors[t]) for t in problem.successors)),
+        "nb_resources": str(len(problem.resources_list)),
+        "horizon": str(problem.horizon),
+    }
+
+
+def export_rows(rows: List[Dict[str, Any]], path: str):
+    """Writes rows as CSV if path ends with .csv, as a JSON list otherwise."""
+    with open(path, "w", newline="") as file:
+        if path.endswith(".csv"):
+            columns = list(rows[0]) if rows else []
+            writer = csv.DictWriter(file, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            json.dump(rows, file, indent=1)
+
+
+class ConvergenceTrace:
+    """Improving schedules of a solve, in the order they were found : wall clock
+    timestamp, time elapsed since the start of the solve, objective and name
+    of the solver that found it."""
+
+    def __init__(self, problem: str = ""):
+        self.problem = problem
+        self.start = time.perf_counter()
+        self.entries: List[Dict[str, Any]] = []
+
+    @property
+    def best(self) -> Optional[float]:
+        return self.entries[-1]["objective"] if self.entries else None
+
+    def record(
+        self, objective: float, solver: str, found_time: Optional[float] = None
+    ) -> bool:
+        # Only improving schedules are kept, True if it is one. found_time is
+        # the time.perf_counter() value when the schedule was found, if it is
+        # recorded afterwards.
+        if self.best is not None and objective >= self.best:
+            return False
+        now = time.perf_counter()
+        if found_time is None:
+            found_time = now
+        self.entries.append(
+            {
+                "problem": self.problem,
+                "solver": solver,
+                "timestamp": time.time() - (now - found_time),
+                "elapsed_time": found_time - self.start,
+                "objective": objective,
+            }
+        )
+        return True
+
+    def export(self, path: str):
+        export_rows(self.entries, path)
+
+
+def trace_evaluations(
+    problem: RCPSPModel, on_schedule: Callable[[RCPSPSolution, float], bool]
+) -> RCPSPModel:
+    """Copy of the problem to give to a solver, reporting each feasible schedule
+    the solver evaluates with its makespan when it is found.
+
+    DO solvers evaluate their candidates with problem.evaluate, which is
+    shadowed on a shallow copy so that the problem, which may be shared (e.g.
+    by the conversion cache), is left untouched, and evaluations from threads
+    of the solver are reported as well. Once on_schedule returns True,
+    SolveStopped is raised from every evaluation. Solvers that evaluate their
+    schedules only once done (e.g. the MiniZinc CP solvers) report them then.
+    """
+    evaluate = problem.evaluate
+    lock = threading.Lock()
+    stopped = False
+
+    def traced_evaluate(solution: RCPSPSolution) -> Dict[str, float]:
+        nonlocal stopped
+        values = evaluate(solution)
+        with lock:
+            if (
+                not stopped
+                and solution.rcpsp_schedule_feasible
+                and values["constraint_penalty"] == 0
+            ):
+                stopped = on_schedule(solution, values["makespan"])
+            if stopped:
+                raise SolveStopped()
+        return values
+
+    traced = copy.copy(problem)
+    traced.evaluate = traced_evaluate
+    return traced
+
+
+class SolveProfiler:
+    """Opt-in cProfile and tracemalloc capture around a solve.
+
+    The CPU profile gives the functions with the largest cumulative time, the
+    memory profile the source lines whose allocations grew most during the
+    capture (still allocated at its end), top rows each.
+    """
+
+    def __init__(self, cpu: bool = True, memory: bool = False, top: int = 50):
+        self.cpu = cpu
+        self.memory = memory
+        self.top = top
+        self.profile: Optional[cProfile.Profile] = None
+        self.peak_memory: Optional[int] = None
+        self._snapshots: List[tracemalloc.Snapshot] = []
+        self._started_tracing = False
+        self._thread_profiles: List[cProfile.Profile] = []
+
+    def start(self):
+        if self.cpu:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        if self.memory:
+            self._started_tracing = not tracemalloc.is_tracing()
+            if self._started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self._snapshots = [tracemalloc.take_snapshot()]
+
+    def stop(self):
+        if self.profile is not None:
+            self.profile.disable()
+        if self.memory and len(self._snapshots) == 1:
+            self._snapshots.append(tracemalloc.take_snapshot())
+            _, self.peak_memory = tracemalloc.get_traced_memory()
+            if self._started_tracing:
+                tracemalloc.stop()
+
+    @contextmanager
+    def pause(self) -> Iterator[None]:
+        # CPU profile paused, e.g. while a plan is handed over to the caller.
+        if self.profile is not None:
+            self.profile.disable()
+        try:
+            yield
+        finally:
+            if self.profile is not None:
+                self.profile.enable()
+
+    @contextmanager
+    def thread(self) -> Iterator[None]:
+        # CPU profile of a worker thread, e.g. running the solver, cProfile only
+        # following the thread enabling it before Python 3.12. Later versions
+        # refuse a second profile, the first one following every thread.
+        profile = None
+        if self.profile is not None:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                profile = None
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+                self._thread_profiles.append(profile)
+
+    def cpu_rows(self) -> List[Dict[str, Any]]:
+        if self.profile is None:
+            return []
+        stats = pstats.Stats(self.profile, *self._thread_profiles).stats
+        rows = [
+            {
+                "function": f"{filename}:{line}({function})",
+                "primitive_calls": primitive_calls,
+                "calls": calls,
+                "total_time": total_time,
+                "cumulative_time": cumulative_time,
+            }
+            for (filename, line, function), (
+                primitive_calls,
+                calls,
+                total_time,
+                cumulative_time,
+                _,
+            ) in stats.items()
+        ]
+        rows.sort(key=lambda row: row["cumulative_time"], reverse=True)
+        return rows[: self.top]
+
+    def memory_rows(self) -> List[Dict[str, Any]]:
+        if len(self._snapshots) < 2:
+            return []
+        differences = self._snapshots[1].compare_to(self._snapshots[0], "lineno")
+        return [
+            {
+                "location": str(difference.traceback),
+                "size_diff": difference.size_diff,
+                "count_diff": difference.count_diff,
+                "size": difference.size,
+                "count": difference.count,
+            }
+            for difference in differences[: self.top]
+        ]
+
+    def export_cpu(self, path: str):
+        export_rows(self.cpu_rows(), path)
+
+    def export_memory(self, path: str):
+        export_rows(self.memory_rows(), path)
@@ -0,0 +1,219 @@
+import logging
+import math
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from discrete_optimization.generic_tools.result_storage.result_storage import (
+    ResultStorage,
+)
+from discrete_optimization.rcpsp.rcpsp_model import RCPSPModel, RCPSPSolution
+from ortools.sat.python import cp_model
+
+from up_discreteoptimization.convert_problem import ConvertToDiscreteOptim
+
+logger = logging.getLogger(__name__)
+
+# Used when no time limit is given, as the default of the DO CP solvers.
+DEFAULT_TIME_LIMIT = 30
+
+
+class JobShopModel:
+    """Job shop view of a converted scheduling problem : each activity runs on
+    one machine (a resource of capacity 1) and jobs are chains of activities.
+    Machines may be unavailable on some time windows."""
+
+    def __init__(
+        self,
+        jobs: List[List[str]],
+        machine: Dict[str, str],
+        duration: Dict[str, int],
+        unavailability: Dict[str, List[Tuple[int, int]]],
+        horizon: int,
+    ):
+        self.jobs = jobs
+        self.machine = machine
+        self.duration = duration
+        self.unavailability = unavailability
+        self.horizon = horizon
+
+
+def detect_job_shop(
+    converter: ConvertToDiscreteOptim, horizon: int
+) -> Optional[JobShopModel]:
+    """Returns the job shop structure of the converted problem, None if the
+    problem is not a pure job shop."""
+    if (
+        converter.release_dates
+        or converter.deadlines
+        or any(converter.special_relations.values())
+    ):
+        return None
+    machine = {}
+    duration = {}
+    for task, modes in converter.mode_details.items():
+        if len(modes) != 1:
+            return None
+        demands = {r: q for r, q in modes[1].items() if r != "duration" and q > 0}
+        if len(demands) != 1:
+            return None
+        resource, quantity = next(iter(demands.items()))
+        calendar = converter.calendars.get(resource)
+        if (
+            quantity != 1
+            or calendar is None
+            or calendar.max_value() != 1
+            or min([calendar.capacity] + calendar.values) < 0
+        ):
+            return None
+        machine[task] = resource
+        duration[task] = modes[1]["duration"]
+    # Jobs are the chains of the precedence graph.
+    predecessor = {}
+    for task, successors in converter.successors.items():
+        if len(successors) > 1:
+            return None
+        for successor in successors:
+            if successor in predecessor:
+                return None
+            predecessor[successor] = task
+    jobs = []
+    for task in converter.mode_details:
+        if task in predecessor:
+            continue
+        job = [task]
+        while converter.successors[job[-1]]:
+            job.append(converter.successors[job[-1]][0])
+        jobs.append(job)
+    if sum(len(job) for job in jobs) != len(converter.mode_details):
+        # Some precedences form a cycle.
+        return None
+    unavailability = {}
+    for resource in dict.fromkeys(machine.values()):
+        calendar = converter.calendars[resource]
+        bounds = calendar.change_times + [horizon]
+        unavailability[resource] = [
+            (bounds[i], bounds[i + 1])
+            for i, value in enumerate(calendar.values)
+            if value == 0 and bounds[i] < bounds[i + 1]
+        ]
+        if calendar.capacity == 0:
+            unavailability[resource].insert(0, (0, bounds[0]))
+    return JobShopModel(jobs, machine, duration, unavailability, horizon)
+
+
+class _SolutionCollector(cp_model.CpSolverSolutionCallback):
+    def __init__(
+        self,
+        starts: Dict[str, cp_model.IntVar],
+        on_solution: Optional[Callable[[Dict[str, int], float], bool]] = None,
+    ):
+        super().__init__()
+        self.starts = starts
+        self.on_solution = on_solution
+        self.solutions: List[Dict[str, int]] = []
+
+    def on_solution_callback(self):
+        # Time the schedule was found, not the time CP-SAT returns.
+        found_time = time.perf_counter()
+        self.solutions.append(
+            {task: self.Value(var) for task, var in self.starts.items()}
+        )
+        if self.on_solution is not None and self.on_solution(
+            self.solutions[-1], found_time
+        ):
+            self.StopSearch()
+
+
+def _rcpsp_solution(
+    job_shop: JobShopModel, problem: RCPSPModel, starts: Dict[str, int]
+) -> RCPSPSolution:
+    schedule = {
+        problem.source_task: {"start_time": 0, "end_time": 0},
+    }
+    for task, start in starts.items():
+        schedule[task] = {
+            "start_time": start,
+            "end_time": start + job_shop.duration[task],
+        }
+    end = max([0] + [s["end_time"] for s in schedule.values()])
+    schedule[problem.sink_task] = {"start_time": end, "end_time": end}
+    return RCPSPSolution(
+        problem=problem,
+        rcpsp_schedule=schedule,
+        rcpsp_modes=[1 for _ in problem.tasks_list_non_dummy],
+    )
+
+
+def solve_job_shop(
+    job_shop: JobShopModel,
+    problem: RCPSPModel,
+    time_limit: Optional[float] = None,
+    warm_solution: Optional[RCPSPSolution] = None,
+    nb_workers: Optional[int] = None,
+    lower_bound: int = 0,
+    on_solution: Optional[Callable[[RCPSPSolution, float], bool]] = None,
+) -> Tuple[ResultStorage, int]:
+    """Solves the job shop with a disjunctive CP-SAT model (one no-overlap
+    constraint per machine). The schedules found are returned, in the order
+    they were found, as solutions of the RCPSP problem, with the makespan
+    lower bound proven by CP-SAT. on_solution, if given, is called with each
+    schedule and the time.perf_counter() value when CP-SAT found it, the search
+    being stopped if it returns True."""
+    model = cp_model.CpModel()
+    horizon = job_shop.horizon
+    starts = {}
+    ends = {}
+    intervals_of_machine = {
+        resource: [
+            model.NewFixedSizeIntervalVar(start, end - start, f"off_{resource}_{start}")
+            for start, end in job_shop.unavailability[resource]
+        ]
+        for resource in job_shop.unavailability
+    }
+    for task, duration in job_shop.duration.items():
+        starts[task] = model.NewIntVar(0, horizon - duration, f"start_{task}")
+        ends[task] = starts[task] + duration
+        intervals_of_machine[job_shop.machine[task]].append(
+            model.NewFixedSizeIntervalVar(starts[task], duration, f"interval_{task}")
+        )
+    for intervals in intervals_of_machine.values():
+        model.AddNoOverlap(intervals)
+    for job in job_shop.jobs:
+        for task, next_task in zip(job[:-1], job[1:]):
+            model.Add(ends[task] <= starts[next_task])
+    # The lower bound lets CP-SAT stop as soon as a schedule reaches it.
+    makespan = model.NewIntVar(min(lower_bound, horizon), horizon, "makespan")
+    model.AddMaxEquality(makespan, list(ends.values()))
+    model.Minimize(makespan)
+    if warm_solution is not None:
+        for task, var in starts.items():
+            model.AddHint(var, warm_solution.get_start_time(task))
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = (
+        DEFAULT_TIME_LIMIT if time_limit is None else time_limit
+    )
+    if nb_workers is not None:
+        solver.parameters.num_search_workers = nb_workers
+    collector = _SolutionCollector(
+        starts,
+        None
+        if on_solution is None
+        else lambda solution_starts, found_time: on_solution(
+            _rcpsp_solution(job_shop, problem, solution_starts), found_time
+        ),
+    )
+    status = solver.Solve(model, collector)
+    logger.info(
+        f"Job shop solved by CP-SAT : {solver.StatusName(status)}, "
+        f"makespan {solver.ObjectiveValue() if collector.solutions else None}"
+    )
+    list_solution_fits = []
+    for solution_starts in collector.solutions:
+        solution = _rcpsp_solution(job_shop, problem, solution_starts)
+        # Fitness is maximized in the DO result storage.
+        list_solution_fits.append(
+            (solution, -solution.rcpsp_schedule[problem.sink_task]["end_time"])
+        )
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        lower_bound = max(lower_bound, math.ceil(solver.BestObjectiveBound()))
+    return ResultStorage(list_solution_fits=list_solution_fits), lower_bound
@@ -0,0 +1,85 @@
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, List, Optional, Set
+
+import numpy as np
+from unified_planning.environment import Environment
+from unified_planning.model import FNode
+from unified_planning.model.scheduling import Activity
+from unified_planning.plans import Schedule
+from unified_planning.plans.schedule import Variable
+
+
+class LazyAssignment(MutableMapping):
+    """Assignment of the activity timepoints read from an array of times, the
+    value of a timepoint is only built as an expression when it is accessed.
+
+    timepoint_index gives the position of each timepoint in times, it is shared
+    by all the assignments of a converted problem. Values set afterwards
+    override the array.
+    """
+
+    def __init__(
+        self,
+        timepoint_index: Dict[Variable, int],
+        times: np.ndarray,
+        environment: Environment,
+    ):
+        self.timepoint_index = timepoint_index
+        self.times = times
+        self.environment = environment
+        self._overrides: Dict[Variable, FNode] = {}
+        self._removed: Set[Variable] = set()
+
+    def __getitem__(self, var: Variable) -> FNode:
+        if var in self._overrides:
+            return self._overrides[var]
+        if var in self._removed or var not in self.timepoint_index:
+            raise KeyError(var)
+        return self.environment.expression_manager.Int(
+            int(self.times[self.timepoint_index[var]])
+        )
+
+    def __setitem__(self, var: Variable, value: FNode):
+        self._overrides[var] = value
+        self._removed.discard(var)
+
+    def __delitem__(self, var: Variable):
+        if var not in self:
+            raise KeyError(var)
+        self._overrides.pop(var, None)
+        if var in self.timepoint_index:
+            self._removed.add(var)
+
+    def __contains__(self, var: object) -> bool:
+        return var in self._overrides or (
+            var in self.timepoint_index and var not in self._removed
+        )
+
+    def __iter__(self) -> Iterator[Variable]:
+        for var in self.timepoint_index:
+            if var not in self._removed and var not in self._overrides:
+                yield var
+        yield from self._overrides
+
+    def __len__(self) -> int:
+        # Removed timepoints are never overridden, see __setitem__ and __delitem__.
+        overridden = sum(var in self.timepoint_index for var in self._overrides)
+        return (
+            len(self.timepoint_index)
+            - len(self._removed)
+            - overridden
+            + len(self._overrides)
+        )
+
+
+class LazySchedule(Schedule):
+    """UP schedule whose assignment is a LazyAssignment."""
+
+    def __init__(
+        self,
+        activities: List[Activity],
+        assignment: LazyAssignment,
+        environment: Optional[Environment] = None,
+    ):
+        super().__init__(activities=activities, environment=environment)
+        self._assignment = assignment
@@ -0,0 +1,245 @@
+import logging
+import os
+from typing import List, Optional
+
+import numpy as np
+from discrete_optimization.rcpsp.rcpsp_model import RCPSPModel
+from unified_planning.model.scheduling import SchedulingProblem
+from unified_planning.shortcuts import LE
+
+from up_discreteoptimization.indexed_model import IndexedModel
+
+logger = logging.getLogger(__name__)
+
+
+class JobShopInstance:
+    """Job shop instance as arrays : operation k of job j runs on
+    machines[j, k] for durations[j, k]. Machines are numbered from 0 to
+    nb_machines - 1, nb_machines being by default the number of machines used."""
+
+    def __init__(
+        self,
+        machines: np.ndarray,
+        durations: np.ndarray,
+        name: str,
+        nb_machines: Optional[int] = None,
+    ):
+        self.machines = machines
+        self.durations = durations
+        self.name = name
+        self.nb_machines = (
+            len(np.unique(machines)) if nb_machines is None else nb_machines
+        )
+        if machines.size and (machines.min() < 0 or machines.max() >= self.nb_machines):
+            raise ValueError(
+                f"{name} : machines should be numbered from 0 to {self.nb_machines - 1}"
+            )
+
+    @property
+    def nb_jobs(self) -> int:
+        return self.machines.shape[0]
+
+    def activity_names(self) -> List[str]:
+        return [
+            f"job_{j}_sub_{k}"
+            for j in range(self.machines.shape[0])
+            for k in range(self.machines.shape[1])
+        ]
+
+    def to_indexed_model(self) -> IndexedModel:
+        # Each operation uses its machine and precedes the next one of its job.
+        nb_jobs, nb_operations = self.machines.shape
+        nb_tasks = nb_jobs * nb_operations
+        demands = np.zeros((nb_tasks, self.nb_machines), dtype=np.int64)
+        demands[np.arange(nb_tasks), self.machines.ravel()] = 1
+        has_successor = np.ones((nb_jobs, nb_operations), dtype=np.int64)
+        has_successor[:, nb_operations - 1 :] = 0
+        return IndexedModel(
+            task_names=self.activity_names(),
+            resource_names=[f"machine_{m}" for m in range(self.nb_machines)],
+            durations=self.durations.ravel(),
+            demands=demands,
+            successors_indptr=np.concatenate([[0], np.cumsum(has_successor)]),
+            successors_indices=np.flatnonzero(has_successor.ravel()) + 1,
+        )
+
+
+class RCPSPInstance:
+    """Single mode RCPSP instance as arrays : durations (n,), demands (n, r),
+    capacities (r,), and successors in compressed sparse row form, those of
+    task i being successors_indices[successors_indptr[i]:successors_indptr[i+1]].
+    """
+
+    def __init__(
+        self,
+        durations: np.ndarray,
+        demands: np.ndarray,
+        capacities: np.ndarray,
+        successors_indptr: np.ndarray,
+        successors_indices: np.ndarray,
+        resource_names: List[str],
+        name: str,
+    ):
+        self.durations = durations
+        self.demands = demands
+        self.capacities = capacities
+        self.successors_indptr = successors_indptr
+        self.successors_indices = successors_indices
+        self.resource_names = resource_names
+        self.name = name
+
+    @property
+    def nb_tasks(self) -> int:
+        return len(self.durations)
+
+    def activity_names(self) -> List[str]:
+        # PSPLIB numbering, dummy source and sink jobs included.
+        return [str(i + 1) for i in range(self.nb_tasks)]
+
+    def to_indexed_model(self) -> IndexedModel:
+        return IndexedModel(
+            task_names=self.activity_names(),
+            resource_names=list(self.resource_names),
+            durations=self.durations,
+            demands=self.demands,
+            successors_indptr=self.successors_indptr,
+            successors_indices=self.successors_indices,
+        )
+
+
+def load_jsplib(filename: str, name: Optional[str] = None) -> JobShopInstance:
+    """Reads a JSPLIB (Taillard format) file : the numbers of jobs and machines,
+    then one line per job of (machine, duration) pairs. Lines starting with #
+    are comments."""
+    with open(filename, "r") as file:
+        text = "".join(line for line in file if not line.startswith("#"))
+    values = np.array(text.split(), dtype=np.int64)
+    nb_jobs, nb_machines = int(values[0]), int(values[1])
+    if len(values) != 2 + 2 * nb_jobs * nb_machines:
+        raise ValueError(
+            f"{filename} : expected {nb_jobs} jobs of {nb_machines} operations"
+        )
+    operations = values[2:].reshape(nb_jobs, nb_machines, 2)
+    return JobShopInstance(
+        machines=operations[:, :, 0].copy(),
+        durations=operations[:, :, 1].copy(),
+        name=os.path.basename(filename) if name is None else name,
+        nb_machines=nb_machines,
+    )
+
+
+def load_psplib(filename: str, name: Optional[str] = None) -> RCPSPInstance:
+    """Reads a single mode PSPLIB (.sm) file, in one pass over its lines."""
+    nb_tasks = None
+    nb_nonrenewable = 0
+    successors_of_task: List[List[int]] = []
+    requests: List[List[int]] = []
+    resource_names: List[str] = []
+    capacities = None
+    with open(filename, "r") as file:
+        lines = iter(file)
+        for line in lines:
+            if line.startswith("jobs (incl. supersource/sink )"):
+                nb_tasks = int(line.split(":")[1])
+            elif line.strip().startswith("- nonrenewable"):
+                nb_nonrenewable = int(line.split(":")[1].split()[0])
+            elif line.startswith("PRECEDENCE RELATIONS"):
+                next(lines)
+                for _ in range(nb_tasks):
+                    row = next(lines).split()
+                    if int(row[1]) != 1:
+                        raise ValueError(f"{filename} : only single mode is supported")
+                    successors_of_task.append([int(s) - 1 for s in row[3:]])
+            elif line.startswith("REQUESTS/DURATIONS"):
+                next(lines)
+                next(lines)
+                requests = [next(lines).split()[2:] for _ in range(nb_tasks)]
+            elif line.startswith("RESOURCEAVAILABILITIES"):
+                header = next(lines).split()
+                resource_names = [
+                    header[i] + header[i + 1] for i in range(0, len(header), 2)
+                ]
+                capacities = np.array(next(lines).split(), dtype=np.int64)
+    if nb_tasks is None or capacities is None or len(requests) != nb_tasks:
+        raise ValueError(f"{filename} is not a PSPLIB single mode file")
+    if nb_nonrenewable > 0:
+        raise ValueError(f"{filename} : non renewable resources are not supported")
+    table = np.array(requests, dtype=np.int64)
+    counts = np.array([len(s) for s in successors_of_task], dtype=np.int64)
+    return RCPSPInstance(
+        durations=table[:, 0],
+        demands=table[:, 1:],
+        capacities=capacities,
+        successors_indptr=np.concatenate([[0], np.cumsum(counts)]),
+        successors_indices=np.array(
+            [s for successors in successors_of_task for s in successors],
+            dtype=np.int64,
+        ),
+        resource_names=resource_names,
+        name=os.path.basename(filename) if name is None else name,
+    )
+
+
+def job_shop_to_up(
+    instance: JobShopInstance, name: Optional[str] = None
+) -> SchedulingProblem:
+    problem = SchedulingProblem(instance.name if name is None else name)
+    machines = [
+        problem.add_resource(name=f"machine_{m}", capacity=1)
+        for m in range(instance.nb_machines)
+    ]
+    names = iter(instance.activity_names())
+    for machines_job, durations_job in zip(
+        instance.machines.tolist(), instance.durations.tolist()
+    ):
+        previous = None
+        for machine, duration in zip(machines_job, durations_job):
+            activity = problem.add_activity(next(names), duration=duration)
+            activity.uses(resource=machines[machine], amount=1)
+            if previous is not None:
+                # Attached to the activity, the problem-level constraint list
+                # checks for duplicates at each insertion.
+                activity.add_constraint(LE(previous.end, activity.start))
+            previous = activity
+    return problem
+
+
+def rcpsp_to_up(
+    instance: RCPSPInstance, name: Optional[str] = None
+) -> SchedulingProblem:
+    problem = SchedulingProblem(instance.name if name is None else name)
+    resources = [
+        problem.add_resource(resource_name, int(capacity))
+        for resource_name, capacity in zip(instance.resource_names, instance.capacities)
+    ]
+    activities = []
+    for activity_name, duration, demands in zip(
+        instance.activity_names(),
+        instance.durations.tolist(),
+        instance.demands.tolist(),
+    ):
+        activity = problem.add_activity(name=activity_name, duration=duration)
+        for resource, demand in zip(resources, demands):
+            if demand > 0:
+                activity.uses(resource, demand)
+        activities.append(activity)
+    indptr = instance.successors_indptr.tolist()
+    indices = instance.successors_indices.tolist()
+    for i, activity in enumerate(activities):
+        for j in indices[indptr[i] : indptr[i + 1]]:
+            activities[j].add_constraint(LE(activity.end, activities[j].start))
+    return problem
+
+
+def job_shop_to_do(instance: JobShopInstance) -> RCPSPModel:
+    """DO model of the job shop, without going through a UP problem."""
+    return instance.to_indexed_model().to_rcpsp_model(
+        resources={f"machine_{m}": 1 for m in range(instance.nb_machines)}
+    )
+
+
+def rcpsp_to_do(instance: RCPSPInstance) -> RCPSPModel:
+    """DO model of the RCPSP instance, without going through a UP problem."""
+    return instance.to_indexed_model().to_rcpsp_model(
+        resources=dict(zip(instance.resource_names, instance.capacities.tolist()))
+    )
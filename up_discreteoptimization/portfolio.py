@@ -0,0 +1,256 @@
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from discrete_optimization.generic_tools.do_solver import SolverDO
+from discrete_optimization.generic_tools.result_storage.result_storage import (
+    ResultStorage,
+)
+from discrete_optimization.rcpsp.rcpsp_model import RCPSPModel, RCPSPSolution
+from discrete_optimization.rcpsp.rcpsp_solvers import solve
+
+from up_discreteoptimization.convert_problem import set_solver_special_constraints
+from up_discreteoptimization.time_budget import set_solver_time_limit
+
+logger = logging.getLogger(__name__)
+
+PortfolioEntry = Tuple[Type[SolverDO], Dict[str, Any]]
+
+# Share of the remaining time given to each solver of the portfolio.
+WORKER_TIME_SHARE = 0.9
+
+# Seconds a terminated worker gets to exit before being killed.
+KILL_GRACE_PERIOD = 1.0
+
+
+def _portfolio_worker(
+    index: int,
+    solver_class: Type[SolverDO],
+    params_solver: Dict[str, Any],
+    problem: RCPSPModel,
+    time_limit: Optional[float],
+    results_queue: "multiprocessing.Queue",
+):
+    # Only the best schedule goes back to the main process, the solution is
+    # rebuilt there on its own copy of the problem.
+    if hasattr(os, "setpgrp"):
+        # Own process group, so that child processes (e.g. minizinc) are killed with it.
+        os.setpgrp()
+    # Killed at once, whatever the handler of the parent process.
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    try:
+        params_solver = set_solver_special_constraints(
+            solver_class, params_solver, problem
+        )
+        if time_limit is not None:
+            params_solver = set_solver_time_limit(
+                solver_class, params_solver, time_limit, problem
+            )
+        solution = solve(
+            method=solver_class, rcpsp_model=problem, **params_solver
+        ).get_best_solution()
+        if solution is None:
+            results_queue.put((index, None))
+        else:
+            results_queue.put(
+                (
+                    index,
+                    (
+                        solution.rcpsp_permutation,
+                        solution.rcpsp_modes,
+                        solution.rcpsp_schedule,
+                    ),
+                )
+            )
+    except Exception:
+        logger.exception(f"Solver {solver_class.__name__} failed in the portfolio")
+        results_queue.put((index, None))
+
+
+def kill_process(process: multiprocessing.Process):
+    """Stops the worker and its process group, waiting at most KILL_GRACE_PERIOD
+    at each step. A worker still alive after that is abandoned, it is a daemon
+    process."""
+    if hasattr(os, "killpg") and process.pid is not None:
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+            process.join(KILL_GRACE_PERIOD)
+        except ProcessLookupError:
+            # Exited, or not yet in its own process group.
+            pass
+        if not process.is_alive():
+            return
+    # Terminated on its own, it may not have replaced the SIGTERM handler
+    # inherited from this process yet.
+    process.terminate()
+    process.join(KILL_GRACE_PERIOD)
+    if process.is_alive():
+        process.kill()
+        process.join(KILL_GRACE_PERIOD)
+    if process.is_alive():
+        logger.warning(f"Worker process {process.pid} did not exit, abandoning it")
+
+
+def _run_workers(
+    jobs: List[Tuple[Type[SolverDO], Dict[str, Any], RCPSPModel]],
+    on_solution: Callable[[int, RCPSPSolution], bool],
+    time_limit: Optional[float] = None,
+    max_workers: Optional[int] = None,
+    job_time_limit: Optional[float] = None,
+):
+    """Runs each (solver_class, params, problem) job in its own process, at most
+    max_workers at the same time, each job for at most job_time_limit.
+    on_solution receives the index of the job and its feasible solution,
+    and returns True to stop all the jobs."""
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    start_time = time.perf_counter()
+    context = multiprocessing.get_context()
+    results_queue = context.Queue()
+    pending = list(range(len(jobs)))
+    running: Dict[int, multiprocessing.Process] = {}
+
+    def remaining_time() -> Optional[float]:
+        if time_limit is None:
+            return None
+        return time_limit - (time.perf_counter() - start_time)
+
+    def worker_time_limit() -> Optional[float]:
+        # Solvers are asked to stop a bit before the deadline, so that their
+        # schedules reach the main process before the losers are killed.
+        if time_limit is None:
+            return job_time_limit
+        limit = WORKER_TIME_SHARE * remaining_time()
+        return limit if job_time_limit is None else min(limit, job_time_limit)
+
+    try:
+        while pending or running:
+            while pending and len(running) < max_workers:
+                index = pending.pop(0)
+                solver_class, params_solver, problem = jobs[index]
+                process = context.Process(
+                    target=_portfolio_worker,
+                    args=(
+                        index,
+                        solver_class,
+                        params_solver,
+                        problem,
+                        worker_time_limit(),
+                        results_queue,
+                    ),
+                    daemon=True,
+                )
+                process.start()
+                running[index] = process
+            timeout = remaining_time()
+            if timeout is not None and timeout <= 0:
+                logger.info("Time limit reached, stopping the workers")
+                break
+            try:
+                index, result = results_queue.get(timeout=timeout)
+            except queue.Empty:
+                logger.info("Time limit reached, stopping the workers")
+                break
+            # The worker exits once its result is sent.
+            process = running.pop(index)
+            process.join(KILL_GRACE_PERIOD)
+            if process.is_alive():
+                kill_process(process)
+            if result is None:
+                continue
+            permutation, modes, schedule = result
+            problem = jobs[index][2]
+            solution = RCPSPSolution(
+                problem=problem,
+                rcpsp_permutation=permutation,
+                rcpsp_schedule=schedule,
+                rcpsp_modes=modes,
+            )
+            if not problem.satisfy(solution):
+                continue
+            if on_solution(index, solution):
+                break
+    finally:
+        for process in running.values():
+            kill_process(process)
+
+
+def solve_portfolio(
+    problem: RCPSPModel,
+    portfolio: List[PortfolioEntry],
+    time_limit: Optional[float] = None,
+    max_workers: Optional[int] = None,
+    lower_bound: Optional[int] = None,
+    on_schedule: Optional[Callable[[RCPSPSolution, float, str], bool]] = None,
+) -> ResultStorage:
+    """Runs the solvers of the portfolio concurrently, one process each.
+
+    At most max_workers solvers (one per core by default) run at the same time.
+    Remaining solvers are killed when the time limit is reached or when a
+    schedule matching the lower bound, hence optimal, is found.
+    Returns the feasible schedules found, as a DO result storage. on_schedule,
+    if given, is called with each schedule, its makespan and the solver name as
+    soon as it is received, the portfolio being stopped if it returns True.
+    """
+    list_solution_fits: List[Tuple[RCPSPSolution, float]] = []
+    best_makespan = None
+
+    def on_solution(index: int, solution: RCPSPSolution) -> bool:
+        nonlocal best_makespan
+        makespan = problem.evaluate(solution)["makespan"]
+        solver_name = portfolio[index][0].__name__
+        logger.info(f"{solver_name} found a schedule of makespan {makespan}")
+        # Fitness is maximized in the DO result storage.
+        list_solution_fits.append((solution, -makespan))
+        if on_schedule is not None and on_schedule(solution, makespan, solver_name):
+            return True
+        if best_makespan is None or makespan < best_makespan:
+            best_makespan = makespan
+        if lower_bound is not None and best_makespan <= lower_bound:
+            logger.info("Optimal schedule found, stopping the portfolio")
+            return True
+        return False
+
+    _run_workers(
+        [(solver_class, params, problem) for solver_class, params in portfolio],
+        on_solution,
+        time_limit=time_limit,
+        max_workers=max_workers,
+    )
+    return ResultStorage(list_solution_fits=list_solution_fits)
+
+
+def solve_components(
+    problems: List[RCPSPModel],
+    solver_class: Type[SolverDO],
+    params_solver: Dict[str, Any],
+    time_limit: Optional[float] = None,
+    max_workers: Optional[int] = None,
+) -> List[Optional[RCPSPSolution]]:
+    """Solves independent problems concurrently with the same solver, one process
+    each. Returns the solution of each problem, None if none was found in time."""
+    solutions: List[Optional[RCPSPSolution]] = [None for _ in problems]
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if time_limit is not None and len(problems) > max_workers:
+        # Problems waiting for a free worker get their share of the time.
+        job_time_limit = WORKER_TIME_SHARE * time_limit * max_workers / len(problems)
+    else:
+        job_time_limit = None
+
+    def on_solution(index: int, solution: RCPSPSolution) -> bool:
+        solutions[index] = solution
+        return False
+
+    _run_workers(
+        [(solver_class, params_solver, problem) for problem in problems],
+        on_solution,
+        time_limit=time_limit,
+        max_workers=max_workers,
+        job_time_limit=job_time_limit,
+    )
+    return solutions
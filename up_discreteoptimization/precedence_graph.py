@@ -0,0 +1,68 @@
+import logging
+from collections import deque
+from typing import Dict, Hashable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def topological_order(successors: Dict[Hashable, List[Hashable]]) -> List[Hashable]:
+    """Tasks sorted so that each task comes before its successors.
+
+    Raises a ValueError naming tasks of a cycle if the graph is not acyclic.
+    """
+    nb_predecessors = {task: 0 for task in successors}
+    for task in successors:
+        for successor in successors[task]:
+            nb_predecessors[successor] += 1
+    queue = deque(task for task in successors if nb_predecessors[task] == 0)
+    order = []
+    while queue:
+        task = queue.popleft()
+        order.append(task)
+        for successor in successors[task]:
+            nb_predecessors[successor] -= 1
+            if nb_predecessors[successor] == 0:
+                queue.append(successor)
+    if len(order) < len(successors):
+        in_cycle = [task for task in successors if nb_predecessors[task] > 0]
+        raise ValueError(
+            f"The precedence constraints contain a cycle, "
+            f"involving (at least) the activities {in_cycle[:10]}"
+        )
+    return order
+
+
+def transitive_reduction(
+    successors: Dict[Hashable, List[Hashable]]
+) -> Tuple[Dict[Hashable, List[Hashable]], int]:
+    """Removes the precedence edges implied by other ones (and duplicated edges).
+
+    Returns the reduced successors and the number of removed edges.
+    """
+    order = topological_order(successors)
+    rank = {task: i for i, task in enumerate(order)}
+    nb_predecessors = {task: 0 for task in successors}
+    for task in successors:
+        for successor in set(successors[task]):
+            nb_predecessors[successor] += 1
+    # Tasks reachable from each task, as bitsets over the topological ranks.
+    # They are freed once all the predecessors of the task are processed.
+    reachable: Dict[Hashable, int] = {}
+    reduced: Dict[Hashable, List[Hashable]] = {}
+    nb_removed = 0
+    for task in reversed(order):
+        reach = 0
+        kept = []
+        # Closest successors first : a successor reachable through another
+        # successor comes after it in the topological order.
+        for successor in sorted(set(successors[task]), key=rank.__getitem__):
+            if not reach >> rank[successor] & 1:
+                kept.append(successor)
+                reach |= reachable[successor] | 1 << rank[successor]
+            nb_predecessors[successor] -= 1
+            if nb_predecessors[successor] == 0:
+                del reachable[successor]
+        nb_removed += len(successors[task]) - len(kept)
+        reduced[task] = kept
+        reachable[task] = reach
+    return {task: reduced[task] for task in successors}, nb_removed
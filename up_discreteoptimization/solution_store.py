@@ -0,0 +1,180 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from enum import Enum
+from typing import Any, Dict, FrozenSet, Iterator, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+StoredSolution = Tuple[float, Dict[str, int]]
+
+
+def _canonical(value: Any, path: FrozenSet[int] = frozenset()) -> Any:
+    # JSON-serializable form of a parameter value, the same for equal values
+    # built in different runs : enums by name, functions and classes by
+    # qualified name, other objects through their attributes.
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Enum):
+        return f"{type(value).__name__}.{value.name}"
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, type) or callable(value) and hasattr(value, "__qualname__"):
+        return f"{getattr(value, '__module__', '')}.{value.__qualname__}"
+    if id(value) in path:
+        # Reference cycle.
+        return f"<{type(value).__name__}>"
+    path = path | {id(value)}
+    if isinstance(value, np.ndarray):
+        return _canonical(value.tolist(), path)
+    if isinstance(value, dict):
+        canonical = {}
+        for key, item in value.items():
+            key = _canonical(key, path)
+            if not isinstance(key, str):
+                key = json.dumps(key, sort_keys=True)
+            canonical[key] = _canonical(item, path)
+        return canonical
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v, path) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(
+            (_canonical(v, path) for v in value),
+            key=lambda v: json.dumps(v, sort_keys=True),
+        )
+    attributes = dict(getattr(value, "__dict__", {}))
+    for cls in type(value).__mro__:
+        slots = getattr(cls, "__slots__", ())
+        for name in [slots] if isinstance(slots, str) else slots:
+            if hasattr(value, name):
+                attributes[name] = getattr(value, name)
+    if attributes:
+        return {type(value).__name__: _canonical(attributes, path)}
+    return re.sub(r" at 0x[0-9a-fA-F]+", "", repr(value))
+
+
+def solver_key(solver_name: str, params: Dict[str, Any]) -> str:
+    # Canonical JSON, keys sorted, so that the same configuration gives the
+    # same key in every run (no memory address of parameter objects).
+    return f"{solver_name}|" + json.dumps(_canonical(params), sort_keys=True)
+
+
+class SolutionStore:
+    """Best known schedule of each (problem, solver configuration), persisted in
+    a SQLite file.
+
+    Schedules are stored as the start time of each activity, in the time unit
+    of the problem, with their makespan. An entry is only replaced by a better
+    schedule, and the least recently used entries are evicted beyond max_entries.
+    If path is a directory, the store is the file solutions.sqlite inside it.
+    """
+
+    def __init__(self, path: str, max_entries: int = 1000):
+        if os.path.isdir(path):
+            path = os.path.join(path, "solutions.sqlite")
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS solutions ("
+                "problem_key TEXT NOT NULL, "
+                "solver_key TEXT NOT NULL, "
+                "objective REAL NOT NULL, "
+                "start_times TEXT NOT NULL, "
+                "last_access REAL NOT NULL, "
+                "PRIMARY KEY (problem_key, solver_key))"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # One short-lived connection (and transaction) per operation, so that
+        # several processes can share the store.
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def get(self, problem_key: str, solver_key: str) -> Optional[StoredSolution]:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT objective, start_times FROM solutions "
+                "WHERE problem_key = ? AND solver_key = ?",
+                (problem_key, solver_key),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            connection.execute(
+                "UPDATE solutions SET last_access = ? "
+                "WHERE problem_key = ? AND solver_key = ?",
+                (time.time(), problem_key, solver_key),
+            )
+        self.hits += 1
+        return row[0], json.loads(row[1])
+
+    def get_best(self, problem_key: str) -> Optional[StoredSolution]:
+        # Best schedule known for the problem, whatever the solver.
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT objective, start_times FROM solutions "
+                "WHERE problem_key = ? ORDER BY objective LIMIT 1",
+                (problem_key,),
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def put(
+        self,
+        problem_key: str,
+        solver_key: str,
+        objective: float,
+        start_times: Dict[str, int],
+    ) -> bool:
+        """Stores the schedule if it is better than the known one, returns True
+        if it was stored."""
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT objective FROM solutions "
+                "WHERE problem_key = ? AND solver_key = ?",
+                (problem_key, solver_key),
+            ).fetchone()
+            if row is not None and row[0] <= objective:
+                return False
+            connection.execute(
+                "INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?)",
+                (
+                    problem_key,
+                    solver_key,
+                    objective,
+                    json.dumps(start_times),
+                    time.time(),
+                ),
+            )
+            connection.execute(
+                "DELETE FROM solutions WHERE rowid NOT IN ("
+                "SELECT rowid FROM solutions ORDER BY last_access DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+        logger.debug(f"Solution of makespan {objective} stored")
+        return True
+
+    def clear(self):
+        with self._connect() as connection:
+            connection.execute("DELETE FROM solutions")
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        with self._connect() as connection:
+            return connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
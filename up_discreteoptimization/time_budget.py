@@ -0,0 +1,170 @@
+import copy
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Type
+
+from discrete_optimization.generic_rcpsp_tools.gphh_solver import GPHH, ParametersGPHH
+from discrete_optimization.generic_tools.cp_tools import CPSolver, ParametersCP
+from discrete_optimization.generic_tools.do_solver import SolverDO
+from discrete_optimization.generic_tools.ea.ga_tools import ParametersGa
+from discrete_optimization.generic_tools.lp_tools import MilpSolver, ParametersMilp
+from discrete_optimization.rcpsp.rcpsp_model import RCPSPModel, RCPSPSolution
+from discrete_optimization.rcpsp.rcpsp_solvers import (
+    LNS_CP_RCPSP_SOLVER,
+    LNS_LP_RCPSP_SOLVER,
+    GA_MRCPSP_Solver,
+    GA_RCPSP_Solver,
+    LargeNeighborhoodSearchRCPSP,
+    LargeNeighborhoodSearchScheduling,
+    LS_RCPSP_Solver,
+)
+
+logger = logging.getLogger(__name__)
+
+# Share of the timeout kept for the plan back-conversion, the solver gets
+# whatever remains once the UP -> DO conversion is done.
+BACK_CONVERSION_SHARE = 0.05
+
+# Solvers stopping by themselves after max_time_seconds.
+TIMED_SOLVERS = (
+    LNS_CP_RCPSP_SOLVER,
+    LargeNeighborhoodSearchRCPSP,
+    LargeNeighborhoodSearchScheduling,
+    LS_RCPSP_Solver,
+)
+
+
+class TimeBudget:
+    """Split of a global timeout between conversion, solving and back-conversion."""
+
+    def __init__(self, timeout: Optional[float]):
+        self.timeout = timeout
+        self.start_time = time.perf_counter()
+        self.solver_limit_reached = False
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start_time
+
+    def remaining(self) -> Optional[float]:
+        if self.timeout is None:
+            return None
+        return max(0.0, self.timeout - self.elapsed())
+
+    def solving_time(self) -> Optional[float]:
+        # Time left for the solver, once the back-conversion share is put aside.
+        if self.timeout is None:
+            return None
+        return max(0.0, self.remaining() - BACK_CONVERSION_SHARE * self.timeout)
+
+    @contextmanager
+    def solving(self) -> Iterator[Optional[float]]:
+        """Gives the solving time of a solver run, recording whether the run
+        lasted up to the native limit it was set to."""
+        time_limit = self.solving_time()
+        start = time.perf_counter()
+        try:
+            yield time_limit
+        finally:
+            # Native limits are whole seconds, one at least.
+            if time_limit is not None and time.perf_counter() - start >= max(
+                1, int(time_limit)
+            ):
+                self.solver_limit_reached = True
+
+    def expired(self) -> bool:
+        # The timeout is over, or a solver stopped on the limit derived from it.
+        return self.timeout is not None and (
+            self.elapsed() >= self.timeout or self.solver_limit_reached
+        )
+
+
+def estimate_evaluation_time(problem: RCPSPModel, nb_samples: int = 3) -> float:
+    # Average time of one schedule generation, used to turn a time budget
+    # into a number of evaluations for evolutionary solvers.
+    permutation = list(range(problem.n_jobs_non_dummy))
+    modes = [1 for _ in range(problem.n_jobs_non_dummy)]
+    # First evaluation out of the measure, it includes the jit compilation.
+    problem.evaluate(
+        RCPSPSolution(problem=problem, rcpsp_permutation=permutation, rcpsp_modes=modes)
+    )
+    start = time.perf_counter()
+    for _ in range(nb_samples):
+        solution = RCPSPSolution(
+            problem=problem, rcpsp_permutation=permutation, rcpsp_modes=modes
+        )
+        problem.evaluate(solution)
+    return max((time.perf_counter() - start) / nb_samples, 1e-6)
+
+
+def _cap_parameters_cp(parameters_cp: ParametersCP, seconds: float) -> ParametersCP:
+    parameters_cp = copy.deepcopy(parameters_cp)
+    parameters_cp.time_limit = max(1, min(parameters_cp.time_limit, int(seconds)))
+    parameters_cp.time_limit_iter0 = max(
+        1, min(parameters_cp.time_limit_iter0, int(seconds))
+    )
+    return parameters_cp
+
+
+def set_solver_time_limit(
+    solver_class: Type[SolverDO],
+    params_solver: Dict[str, Any],
+    seconds: float,
+    problem: RCPSPModel,
+) -> Dict[str, Any]:
+    """Returns a copy of the solver parameters with the native limit of the solver
+    family set so that solving fits in the given number of seconds."""
+    params_solver = dict(params_solver)
+    # User limits are kept when they are already tighter than the budget.
+    if issubclass(solver_class, CPSolver):
+        params_solver["parameters_cp"] = _cap_parameters_cp(
+            params_solver.get("parameters_cp", ParametersCP.default()), seconds
+        )
+    elif issubclass(solver_class, MilpSolver):
+        parameters_milp = copy.deepcopy(
+            params_solver.get("parameters_milp", ParametersMilp.default())
+        )
+        parameters_milp.time_limit = max(
+            1, min(parameters_milp.time_limit, int(seconds))
+        )
+        params_solver["parameters_milp"] = parameters_milp
+    elif issubclass(solver_class, TIMED_SOLVERS):
+        params_solver["max_time_seconds"] = max(
+            1, min(params_solver.get("max_time_seconds", seconds), int(seconds))
+        )
+        if issubclass(solver_class, LS_RCPSP_Solver):
+            # The local search only checks its time limit every 1000 iterations.
+            nb_iteration_max = int(seconds / estimate_evaluation_time(problem))
+            params_solver["nb_iteration_max"] = max(
+                1, min(params_solver.get("nb_iteration_max", 2000), nb_iteration_max)
+            )
+        if "parameters_cp" in params_solver:
+            # Each LNS iteration can not last more than the whole budget.
+            params_solver["parameters_cp"] = _cap_parameters_cp(
+                params_solver["parameters_cp"], seconds
+            )
+    elif issubclass(solver_class, LNS_LP_RCPSP_SOLVER):
+        # Iterations of this LNS use a fixed MILP time limit of 100s.
+        params_solver["nb_iteration_lns"] = max(1, int(seconds / 100))
+    elif issubclass(solver_class, (GA_RCPSP_Solver, GA_MRCPSP_Solver)):
+        parameters_ga = copy.deepcopy(
+            params_solver.get("parameters_ga", ParametersGa.default_rcpsp())
+        )
+        max_evals = int(seconds / estimate_evaluation_time(problem))
+        parameters_ga.max_evals = max(1, min(parameters_ga.max_evals, max_evals))
+        params_solver["parameters_ga"] = parameters_ga
+    elif issubclass(solver_class, GPHH):
+        params_gphh = copy.deepcopy(
+            params_solver.get("params_gphh", ParametersGPHH.default())
+        )
+        n_gen = int(
+            seconds / (estimate_evaluation_time(problem) * params_gphh.pop_size)
+        )
+        params_gphh.n_gen = max(1, min(params_gphh.n_gen, n_gen))
+        params_solver["params_gphh"] = params_gphh
+    else:
+        logger.warning(
+            f"No native time limit known for {solver_class.__name__}, "
+            f"the timeout can not be enforced during solving."
+        )
+    return params_solver
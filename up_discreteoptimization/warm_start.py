@@ -0,0 +1,140 @@
+import logging
+import random
+from typing import Any, Dict, Type
+
+from discrete_optimization.generic_tools.do_problem import (
+    build_aggreg_function_and_params_objective,
+)
+from discrete_optimization.generic_tools.do_solver import SolverDO
+from discrete_optimization.generic_tools.ea.ga import Ga
+from discrete_optimization.generic_tools.ea.ga_tools import ParametersGa
+from discrete_optimization.generic_tools.lns_mip import TrivialInitialSolution
+from discrete_optimization.generic_tools.result_storage.result_storage import (
+    ResultStorage,
+)
+from discrete_optimization.rcpsp.rcpsp_model import RCPSPModel, RCPSPSolution
+from discrete_optimization.rcpsp.rcpsp_solvers import (
+    LNS_CP_RCPSP_SOLVER,
+    GA_RCPSP_Solver,
+    LargeNeighborhoodSearchRCPSP,
+    LargeNeighborhoodSearchScheduling,
+    LS_RCPSP_Solver,
+    return_solver,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def build_initial_solution_provider(
+    problem: RCPSPModel, solution: RCPSPSolution
+) -> TrivialInitialSolution:
+    # Same result storage as the DO initial solution providers build.
+    (
+        aggreg,
+        _,
+        params_objective_function,
+    ) = build_aggreg_function_and_params_objective(problem)
+    return TrivialInitialSolution(
+        ResultStorage(
+            list_solution_fits=[(solution, aggreg(solution))],
+            best_solution=solution,
+            mode_optim=params_objective_function.sense_function,
+        )
+    )
+
+
+def set_solver_warm_start(
+    solver_class: Type[SolverDO],
+    params_solver: Dict[str, Any],
+    solution: RCPSPSolution,
+    problem: RCPSPModel,
+) -> Dict[str, Any]:
+    """Returns a copy of the solver parameters starting the solver from the given
+    solution, for the solver families taking it as an argument."""
+    params_solver = dict(params_solver)
+    if issubclass(solver_class, LS_RCPSP_Solver):
+        params_solver["init_solution"] = solution
+    elif issubclass(
+        solver_class, (LargeNeighborhoodSearchRCPSP, LargeNeighborhoodSearchScheduling)
+    ):
+        params_solver["initial_solution_provider"] = build_initial_solution_provider(
+            problem, solution
+        )
+    return params_solver
+
+
+def solve_ga_from_solution(
+    problem: RCPSPModel, params_solver: Dict[str, Any], solution: RCPSPSolution
+) -> ResultStorage:
+    """Runs the GA of DO as GA_RCPSP_Solver does, its initial population being the
+    permutation of the solution and random permutations."""
+    parameters_ga: ParametersGa = params_solver.get(
+        "parameters_ga", ParametersGa.default_rcpsp()
+    )
+    permutation = list(solution.rcpsp_permutation)
+    initial_population = [permutation] + [
+        random.sample(permutation, len(permutation))
+        for _ in range(parameters_ga.pop_size - 1)
+    ]
+    return Ga(
+        problem=problem,
+        encoding=parameters_ga.encoding,
+        objective_handling=parameters_ga.objective_handling,
+        objectives=parameters_ga.objectives,
+        objective_weights=parameters_ga.objective_weights,
+        mutation=parameters_ga.mutation,
+        max_evals=parameters_ga.max_evals,
+        crossover=parameters_ga.crossover,
+        selection=parameters_ga.selection,
+        pop_size=parameters_ga.pop_size,
+        mut_rate=parameters_ga.mut_rate,
+        crossover_rate=parameters_ga.crossover_rate,
+        tournament_size=parameters_ga.tournament_size,
+        deap_verbose=parameters_ga.deap_verbose,
+        initial_population=initial_population,
+    ).solve()
+
+
+def solve_from_solution(
+    solver_class: Type[SolverDO],
+    problem: RCPSPModel,
+    params_solver: Dict[str, Any],
+    solution: RCPSPSolution,
+) -> ResultStorage:
+    """Solves the problem with the solver started from a previous solution.
+
+    Local search and LNS solvers start from it, and the GA on the permutation
+    encoding has it in its initial population. Other solvers are run as usual,
+    the previous solution is then only a fallback: the CP solvers of DO run
+    through MiniZinc, which they give no starting point to, and neither do
+    MILP nor GPHH. The CP-SAT model of job shops takes it as hints, see
+    solve_job_shop.
+    """
+    params_solver = set_solver_warm_start(
+        solver_class, params_solver, solution, problem
+    )
+    if (
+        issubclass(solver_class, GA_RCPSP_Solver)
+        and params_solver.get("parameters_ga", ParametersGa.default_rcpsp()).encoding
+        == "rcpsp_permutation"
+    ):
+        return solve_ga_from_solution(problem, params_solver, solution)
+    solver = return_solver(method=solver_class, rcpsp_model=problem, **params_solver)
+    if isinstance(solver, LNS_CP_RCPSP_SOLVER):
+        # This solver builds its own initial solution provider, it is replaced here.
+        provider = build_initial_solution_provider(problem, solution)
+        solver.initial_solution_provider = provider
+        solver.lns_solver.initial_solution_provider = provider
+    elif not issubclass(
+        solver_class,
+        (
+            LS_RCPSP_Solver,
+            LargeNeighborhoodSearchRCPSP,
+            LargeNeighborhoodSearchScheduling,
+        ),
+    ):
+        logger.info(
+            f"{solver_class.__name__} can not start from a given solution, "
+            f"it is only kept as a fallback."
+        )
+    return solver.solve(**params_solver)